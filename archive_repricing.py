@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import re
+from typing import Dict, List, Sequence, Tuple
+
+from currency import approx_prices
+from description_templates import alt_price_lines, format_price
+from jewelry_cost_calculator import calculate_jewelry_cost, cost_input_to_dict, read_materials_csv
+from piece_files import (
+    COST_SECTION_HEADER, DESCRIPTION_HEADER, get_start_price, read_sidecar, record_cost_input,
+    render_cost_section, replace_file, sidecar_path, write_sidecar,
+)
+
+INDEX_NAME = '.price_index.json'
+INDEX_VERSION = 1
+
+# Строки цены в описании для Instagram: «💰 Цена: 2 741₸» / «💰 Price: 2 741₸»
+# вместе со следующими за ними строками в других валютах «💲 Цена: ~5.6$»
+PRICE_LINE_RE = re.compile(r'(💰 (Цена|Price): )[\d   ]+(₸)(?:\n💲 [^\n]*)*')
+
+
+def material_key(name: str, unit: str) -> str:
+    return f"{name}\t{unit}"
+
+
+class DependencyIndex:
+    """
+    Индекс «материал -> изделия» по JSON-записям архива.
+    Для каждого изделия хранится цена, по которой был посчитан каждый материал,
+    поэтому при смене цен затронутые изделия находятся без чтения всего архива.
+    Индекс обновляется инкрементально по mtime JSON-записей.
+    """
+
+    def __init__(self, archive_dir: str):
+        self.archive_dir = archive_dir
+        self.path = os.path.join(archive_dir, INDEX_NAME)
+        self.pieces: Dict[str, dict] = {}       # md-файл -> {"mtime_ns", "prices": {ключ: цена}}
+        self.materials: Dict[str, set] = {}     # ключ материала -> множество md-файлов
+
+    @classmethod
+    def load(cls, archive_dir: str) -> "DependencyIndex":
+        index = cls(archive_dir)
+        try:
+            with open(index.path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                index.pieces = data["pieces"]
+        except (OSError, ValueError, KeyError):
+            pass
+        for md, entry in index.pieces.items():
+            for key in entry["prices"]:
+                index.materials.setdefault(key, set()).add(md)
+        index.refresh()
+        return index
+
+    def save(self) -> None:
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"version": INDEX_VERSION, "pieces": self.pieces}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def refresh(self) -> int:
+        """Подхватывает новые/изменённые записи и удаляет исчезнувшие. Возвращает число обновлённых."""
+        seen = set()
+        updated = 0
+        if not os.path.isdir(self.archive_dir):
+            return 0
+        for entry in os.scandir(self.archive_dir):
+            if not entry.name.endswith('.json') or entry.name.startswith('.'):
+                continue
+            md = entry.name[:-5] + '.md'
+            seen.add(md)
+            mtime = entry.stat().st_mtime_ns
+            known = self.pieces.get(md)
+            if known is not None and known["mtime_ns"] == mtime:
+                continue
+            record = read_sidecar(os.path.join(self.archive_dir, md))
+            if record is None:
+                continue
+            self.update_piece(md, mtime, record)
+            updated += 1
+        for md in [md for md in self.pieces if md not in seen]:
+            self._drop(md)
+        return updated
+
+    def update_piece(self, md: str, mtime_ns: int, record: dict) -> None:
+        """Заносит (или заменяет) изделие md по его JSON-записи с указанным mtime."""
+        self._drop(md)
+        prices = {
+            material_key(m["name"], m["unit"]): m["unit_price"]
+            for m in record["cost_input"]["materials"]
+        }
+        self.pieces[md] = {"mtime_ns": mtime_ns, "prices": prices}
+        for key in prices:
+            self.materials.setdefault(key, set()).add(md)
+
+    def _drop(self, md: str) -> None:
+        entry = self.pieces.pop(md, None)
+        if entry is None:
+            return
+        for key in entry["prices"]:
+            pieces = self.materials.get(key)
+            if pieces is not None:
+                pieces.discard(md)
+                if not pieces:
+                    del self.materials[key]
+
+    def affected(self, prices: Dict[Tuple[str, str], float]) -> List[str]:
+        """Изделия, в которых хотя бы один материал посчитан по цене, отличной от новой."""
+        result = set()
+        for (name, unit), price in prices.items():
+            key = material_key(name, unit)
+            for md in self.materials.get(key, ()):
+                if self.pieces[md]["prices"][key] != price:
+                    result.add(md)
+        return sorted(result)
+
+
+def update_markdown(text: str, result, start_price: int, currencies: Sequence[str] = ()) -> str:
+    """Заменяет разделы себестоимости и строки цены в описании, не трогая остальной текст."""
+    start = text.index(COST_SECTION_HEADER)
+    end = text.index(DESCRIPTION_HEADER, start)
+    text = text[:start] + render_cost_section(result) + text[end:]
+    price = format_price(start_price)
+    alt = approx_prices(start_price, currencies)
+    return PRICE_LINE_RE.sub(
+        lambda m: f"{m.group(1)}{price}{m.group(3)}{alt_price_lines(m.group(2), alt)}", text
+    )
+
+
+def reprice_piece(md_path: str, prices: Dict[Tuple[str, str], float]) -> bool:
+    """Пересчитывает одно изделие по новым ценам и переписывает его .md и JSON-запись."""
+    record = read_sidecar(md_path)
+    if record is None:
+        return False
+    data = record_cost_input(record)
+    currencies = tuple(record.get("currencies", ()))
+    for m in data.materials:
+        m.unit_price = prices.get((m.name, m.unit), m.unit_price)
+    result = calculate_jewelry_cost(data, currencies)
+    with open(md_path, encoding='utf-8') as f:
+        text = f.read()
+    try:
+        text = update_markdown(text, result, get_start_price(result), currencies)
+    except ValueError:
+        return False  # структура файла изменена вручную — не трогаем
+    # .md заменяется первым, JSON-запись — последней: если запуск прервётся между ними,
+    # в записи останутся старые цены и изделие просто пересчитается ещё раз
+    replace_file(md_path, text)
+    record["cost_input"] = cost_input_to_dict(data)
+    write_sidecar(md_path, record)
+    return True
+
+
+def reprice_archive(archive_dir: str = 'jewelry', materials_csv: str = 'short_materials.csv',
+                    dry_run: bool = False) -> List[str]:
+    """
+    Пересчитывает только те изделия архива, чьи материалы подорожали или подешевели.
+    Возвращает список затронутых .md-файлов.
+    """
+    prices = {(m.name, m.unit): m.unit_price for m in read_materials_csv(materials_csv)}
+    index = DependencyIndex.load(archive_dir)
+    affected = index.affected(prices)
+    if not dry_run:
+        for md in affected:
+            path = os.path.join(archive_dir, md)
+            if reprice_piece(path, prices):
+                record = read_sidecar(path)
+                index.update_piece(md, os.stat(sidecar_path(path)).st_mtime_ns, record)
+    index.save()
+    return affected
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Пересчёт цен в архиве изделий после изменения цен материалов')
+    parser.add_argument('--archive', default='jewelry')
+    parser.add_argument('--materials', default='short_materials.csv')
+    parser.add_argument('--dry-run', action='store_true', help='только показать затронутые изделия')
+    args = parser.parse_args()
+    affected = reprice_archive(args.archive, args.materials, args.dry_run)
+    for md in affected:
+        print(f"- {md}")
+    verb = 'будет пересчитано' if args.dry_run else 'пересчитано'
+    print(f"Изделий {verb}: {len(affected)}")
+
+
+if __name__ == '__main__':
+    main()
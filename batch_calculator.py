@@ -0,0 +1,188 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+from jewelry_cost_calculator import (
+    PRICE_TIERS, JewelryCostInput, JewelryCostResult, calculate_jewelry_cost
+)
+
+
+def _pad(rows: List[List[float]], width: int) -> np.ndarray:
+    """Собирает список строк разной длины в матрицу (n, width), дополняя нулями."""
+    out = np.zeros((len(rows), width), dtype=np.float64)
+    for i, row in enumerate(rows):
+        if row:
+            out[i, :len(row)] = row
+    return out
+
+
+@dataclass
+class JewelryCostBatch:
+    """
+    Колоночное представление множества JewelryCostInput.
+    Каждая строка — одно изделие; материалы, расходники и прочие затраты
+    хранятся в матрицах, дополненных нулями до общей ширины.
+    """
+    unit_prices: np.ndarray       # (n, M) цена за единицу материала
+    quantities: np.ndarray        # (n, M) количество материала
+    hours: np.ndarray             # (n,)
+    hourly_rates: np.ndarray      # (n,)
+    consumable_costs: np.ndarray  # (n, C)
+    electricity_cost: np.ndarray  # (n,)
+    tool_depreciation: np.ndarray  # (n,)
+    packaging_cost: np.ndarray    # (n,)
+    extra_costs: np.ndarray       # (n, E)
+    defect_percent: np.ndarray    # (n,)
+
+    def __post_init__(self):
+        n = len(self.hours)
+        for name in ("unit_prices", "quantities", "consumable_costs", "extra_costs"):
+            arr = np.asarray(getattr(self, name), dtype=np.float64)
+            if arr.ndim == 1:
+                arr = arr.reshape(n, -1) if n else arr.reshape(0, 0)
+            setattr(self, name, arr)
+        for name in ("hours", "hourly_rates", "electricity_cost",
+                     "tool_depreciation", "packaging_cost", "defect_percent"):
+            arr = np.broadcast_to(np.asarray(getattr(self, name), dtype=np.float64), (n,))
+            setattr(self, name, arr)
+        if self.unit_prices.shape != self.quantities.shape:
+            raise ValueError("unit_prices и quantities должны иметь одинаковую форму.")
+
+    def __len__(self) -> int:
+        return len(self.hours)
+
+    @classmethod
+    def from_inputs(cls, inputs: Sequence[JewelryCostInput]) -> "JewelryCostBatch":
+        """Переводит список JewelryCostInput в колоночную форму."""
+        prices = [[m.unit_price for m in d.materials] for d in inputs]
+        qty = [[m.quantity for m in d.materials] for d in inputs]
+        cons = [[c.approx_cost for c in d.consumables] for d in inputs]
+        extra = [[c.approx_cost for c in d.extra_costs] for d in inputs]
+        m_width = max((len(r) for r in prices), default=0)
+        c_width = max((len(r) for r in cons), default=0)
+        e_width = max((len(r) for r in extra), default=0)
+        return cls(
+            unit_prices=_pad(prices, m_width),
+            quantities=_pad(qty, m_width),
+            hours=np.fromiter((d.work_time.hours for d in inputs), np.float64, len(inputs)),
+            hourly_rates=np.fromiter((d.work_time.hourly_rate for d in inputs), np.float64, len(inputs)),
+            consumable_costs=_pad(cons, c_width),
+            electricity_cost=np.fromiter((d.electricity_cost for d in inputs), np.float64, len(inputs)),
+            tool_depreciation=np.fromiter((d.tool_depreciation for d in inputs), np.float64, len(inputs)),
+            packaging_cost=np.fromiter((d.packaging_cost for d in inputs), np.float64, len(inputs)),
+            extra_costs=_pad(extra, e_width),
+            defect_percent=np.fromiter((d.defect_percent for d in inputs), np.float64, len(inputs)),
+        )
+
+
+@dataclass
+class JewelryCostBatchResult:
+    """
+    Результаты расчёта для пачки изделий в виде массивов.
+    Детализация (cost_breakdown) строится только по запросу через result(i).
+    tiers — рекомендуемые цены, массив (n, len(PRICE_TIERS)) в порядке PRICE_TIERS;
+    converted — те же цены в других валютах: {код валюты: массив (n, len(PRICE_TIERS))}.
+    """
+    material_cost: np.ndarray
+    work_cost: np.ndarray
+    consumable_cost: np.ndarray
+    defect_cost: np.ndarray
+    total_cost: np.ndarray
+    tiers: np.ndarray
+    inputs: Optional[Sequence[JewelryCostInput]] = None
+    converted: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.total_cost)
+
+    @property
+    def tier_prices(self) -> List[np.ndarray]:
+        """Рекомендуемые цены в порядке PRICE_TIERS, по массиву на наценку."""
+        return list(self.tiers.T)
+
+    @property
+    def min_price(self) -> np.ndarray:
+        return self.tiers[:, 0]
+
+    @property
+    def comfort_price(self) -> np.ndarray:
+        return self.tiers[:, 1]
+
+    @property
+    def premium_price(self) -> np.ndarray:
+        return self.tiers[:, -1]
+
+    def result(self, i: int) -> JewelryCostResult:
+        """Возвращает полный JewelryCostResult для i-го изделия (нужны исходные inputs)."""
+        if self.inputs is None:
+            raise ValueError("Детализация недоступна: пачка создана без исходных JewelryCostInput.")
+        result = calculate_jewelry_cost(self.inputs[i])
+        result.converted_prices = self.converted_prices(i)
+        return result
+
+    def converted_prices(self, i: int) -> Dict[str, Dict[str, float]]:
+        """Цены i-го изделия в других валютах в формате JewelryCostResult.converted_prices."""
+        if not self.converted:
+            return {}
+        return {
+            label: {code: float(values[i, k]) for code, values in self.converted.items()}
+            for k, (label, _) in enumerate(PRICE_TIERS)
+        }
+
+    def results(self) -> List[JewelryCostResult]:
+        return [self.result(i) for i in range(len(self))]
+
+
+def calculate_jewelry_costs(
+    data: Union[JewelryCostBatch, Sequence[JewelryCostInput]],
+    currencies: Tuple[str, ...] = (),
+) -> JewelryCostBatchResult:
+    """
+    Пакетный аналог calculate_jewelry_cost.
+    Порядок сложения повторяет скалярную функцию, поэтому итоги совпадают побитово.
+    Пересчёт в currencies делается одним умножением матрицы цен на вектор курсов.
+    """
+    inputs = None
+    if not isinstance(data, JewelryCostBatch):
+        inputs = data
+        data = JewelryCostBatch.from_inputs(data)
+    n = len(data)
+    total = np.zeros(n, dtype=np.float64)
+    # Материалы
+    mat_costs = data.unit_prices * data.quantities
+    material = np.zeros(n, dtype=np.float64)
+    for j in range(mat_costs.shape[1]):
+        material += mat_costs[:, j]
+        total += mat_costs[:, j]
+    # Время
+    work = data.hours * data.hourly_rates
+    total += work
+    # Расходники
+    consumable = np.zeros(n, dtype=np.float64)
+    for j in range(data.consumable_costs.shape[1]):
+        consumable += data.consumable_costs[:, j]
+        total += data.consumable_costs[:, j]
+    # Электричество, амортизация, упаковка, прочие
+    total += data.electricity_cost
+    total += data.tool_depreciation
+    total += data.packaging_cost
+    for j in range(data.extra_costs.shape[1]):
+        total += data.extra_costs[:, j]
+    # Брак
+    defect = total * data.defect_percent / 100
+    total += defect
+    tiers = total[:, None] * np.array([k for _, k in PRICE_TIERS], dtype=np.float64)
+    converted = {}
+    if currencies:
+        from currency import convert_amounts
+        converted = convert_amounts(tiers, currencies)
+    return JewelryCostBatchResult(
+        material_cost=material,
+        work_cost=work,
+        consumable_cost=consumable,
+        defect_cost=defect,
+        total_cost=total,
+        tiers=tiers,
+        inputs=inputs,
+        converted=converted,
+    )
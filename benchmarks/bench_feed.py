@@ -0,0 +1,52 @@
+"""
+Пиковая память сборки short_materials.csv: чтение целиком против потокового по кускам.
+
+    python benchmarks/bench_feed.py --rows 300000 --chunksize 50000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from material_aggregation import build_short_materials, build_short_materials_streaming  # noqa: E402
+from synthetic import write_info_csv  # noqa: E402
+
+
+def measure(build) -> tuple:
+    tracemalloc.start()
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "info.csv")
+        write_info_csv(src, args.rows)
+        full_s, full_peak = measure(lambda: build_short_materials(src, os.path.join(tmp, "full.csv")))
+        chunk_s, chunk_peak = measure(lambda: build_short_materials_streaming(
+            src, os.path.join(tmp, "chunked.csv"), chunksize=args.chunksize))
+    print(json.dumps({
+        "rows": args.rows,
+        "chunksize": args.chunksize,
+        "full_s": round(full_s, 3),
+        "full_peak_mb": round(full_peak / 2**20, 1),
+        "chunked_s": round(chunk_s, 3),
+        "chunked_peak_mb": round(chunk_peak / 2**20, 1),
+    }, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Регрессионный замер времени холодного импорта.
+
+Запускает отдельный интерпретатор для каждого замера, берёт минимум из нескольких
+попыток и завершается с кодом 1, если импорт дольше бюджета или тянет pandas.
+
+    python benchmarks/bench_import.py --budget-ms 150
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = (
+    "import sys, time\n"
+    "t = time.perf_counter()\n"
+    "import {module}\n"
+    "dt = time.perf_counter() - t\n"
+    "print(dt, 'pandas' in sys.modules)\n"
+)
+
+
+def measure(module: str, repeat: int) -> tuple:
+    """Минимальное время импорта модуля (мс) и флаг, был ли загружен pandas."""
+    best = None
+    pandas_loaded = False
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        dt = float(out[0]) * 1000
+        pandas_loaded = pandas_loaded or out[1] == "True"
+        best = dt if best is None else min(best, dt)
+    return best, pandas_loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="jewelry_cost_calculator")
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    best, pandas_loaded = measure(args.module, args.repeat)
+    ok = best <= args.budget_ms and not pandas_loaded
+    print(json.dumps({
+        "module": args.module,
+        "import_ms": round(best, 2),
+        "budget_ms": args.budget_ms,
+        "pandas_loaded": pandas_loaded,
+        "ok": ok,
+    }, ensure_ascii=False))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
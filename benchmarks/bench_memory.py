@@ -0,0 +1,64 @@
+"""
+Замер памяти: список Material против MaterialTable на синтетическом каталоге.
+
+    python benchmarks/bench_memory.py --rows 1000000 --names 5000
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jewelry_cost_calculator import Material  # noqa: E402
+from material_table import MaterialTable  # noqa: E402
+
+
+def synthetic_rows(rows: int, names: int):
+    pool = [f"Материал {i}" for i in range(names)]
+    for i in range(rows):
+        yield pool[i % names], 10.0 + (i % 997) * 0.25, float(i % 7), "г" if i % 3 else "шт"
+
+
+def retained_bytes(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--names", type=int, default=5000, help="число различных названий")
+    args = parser.parse_args()
+
+    def build_list():
+        return [Material(name=n, unit_price=p, quantity=q, unit=u)
+                for n, p, q, u in synthetic_rows(args.rows, args.names)]
+
+    def build_table():
+        table = MaterialTable()
+        for n, p, q, u in synthetic_rows(args.rows, args.names):
+            table.append(n, p, q, u)
+        return table
+
+    list_bytes = retained_bytes(build_list)
+    table_bytes = retained_bytes(build_table)
+    print(json.dumps({
+        "rows": args.rows,
+        "material_list_mb": round(list_bytes / 2**20, 2),
+        "material_table_mb": round(table_bytes / 2**20, 2),
+        "bytes_per_row_list": round(list_bytes / max(args.rows, 1), 1),
+        "bytes_per_row_table": round(table_bytes / max(args.rows, 1), 1),
+        "ratio": round(list_bytes / max(table_bytes, 1), 1),
+    }, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
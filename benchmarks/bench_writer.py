@@ -0,0 +1,55 @@
+"""
+Запись множества файлов изделий: по одному open/write против фонового PieceWriter.
+
+    python benchmarks/bench_writer.py --files 3000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from piece_files import sidecar_path  # noqa: E402
+from piece_writer import PieceWriter  # noqa: E402
+
+CONTENT = "# кольцо\n\n" + "- Медь (средняя) (3.0 г): 67 тг\n" * 60
+RECORD = {"version": 1, "type": "кольцо", "cost_input": {"materials": [], "consumables": []}}
+
+
+def write_plain(directory: str, files: int, fsync: bool) -> None:
+    for i in range(files):
+        path = os.path.join(directory, f"кольцо_{i}.md")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(CONTENT)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        with open(sidecar_path(path), 'w', encoding='utf-8') as f:
+            json.dump(RECORD, f, ensure_ascii=False, indent=1)
+
+
+def write_background(directory: str, files: int, fsync: bool) -> None:
+    with PieceWriter(fsync=fsync) as writer:
+        for i in range(files):
+            writer.submit(os.path.join(directory, f"кольцо_{i}.md"), CONTENT, RECORD)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=3000)
+    args = parser.parse_args()
+    out = {"files": args.files}
+    for name, fn in (("plain", write_plain), ("writer", write_background)):
+        for fsync in (False, True):
+            with tempfile.TemporaryDirectory(dir=".") as tmp:
+                start = time.perf_counter()
+                fn(tmp, args.files, fsync)
+                out[f"{name}{'_fsync' if fsync else ''}_s"] = round(time.perf_counter() - start, 3)
+    print(json.dumps(out, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Нагрузочный тест локального сервиса quote_service.py.
+
+    python quote_service.py &
+    python benchmarks/load_test.py --requests 5000 --concurrency 64
+
+По умолчанию каждый запрос уникален (меняются часы работы), чтобы кэш расчётов
+не отвечал вместо микро-пакетов; --repeat шлёт один и тот же заказ и меряет попадания в кэш.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+ORDER = {
+    "type": "кольцо", "size": "5-10", "style": "бохо", "hours": 1, "rate": 1000,
+    "materials": [{"name": "Квадратная медь (средняя)", "quantity": 3},
+                  {"name": "Белый натуральный жемчуг", "quantity": 3}],
+}
+
+
+def order_body(n, repeat=False):
+    """Тело n-го запроса: при repeat — всегда ORDER, иначе ORDER со своими часами работы."""
+    order = ORDER if repeat else dict(ORDER, hours=1 + n / 1000)
+    return json.dumps(order, ensure_ascii=False).encode("utf-8")
+
+
+async def worker(host, port, path, first, count, repeat, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for n in range(first, first + count):
+            body = order_body(n, repeat)
+            request = (f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                       f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body
+            t = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - t)
+            if b" 200 " not in status:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    k = min(len(values) - 1, max(0, round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+
+async def run(args):
+    per_worker = [args.requests // args.concurrency] * args.concurrency
+    for i in range(args.requests % args.concurrency):
+        per_worker[i] += 1
+    firsts = [sum(per_worker[:i]) for i in range(len(per_worker))]
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(args.host, args.port, args.path, first, n, args.repeat, latencies, errors)
+                           for first, n in zip(firsts, per_worker) if n))
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "path": args.path,
+        "requests": len(latencies),
+        "concurrency": args.concurrency,
+        "unique_orders": not args.repeat,
+        "errors": len(errors),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }, ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--path", default="/cost", choices=["/cost", "/description"])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--repeat", action="store_true",
+                        help="слать один и тот же заказ (замер ответов из кэша, а не расчёта)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Набор бенчмарков основных путей: расчёт себестоимости, загрузка каталога,
+поиск материала, фильтрация, пересборка short_materials.csv и генерация описаний.
+
+    python benchmarks/run.py run --sizes 100,1000,10000 --out benchmarks/baseline.json
+    python benchmarks/run.py compare benchmarks/baseline.json benchmarks/current.json --threshold 0.2
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from description_templates import render_description  # noqa: E402
+from jewelry_cost_calculator import (  # noqa: E402
+    calculate_jewelry_cost, find_material_price, get_filtered_materials, load_materials_from_csv,
+)
+from material_aggregation import build_short_materials  # noqa: E402
+from material_catalog import MaterialCatalog  # noqa: E402
+from synthetic import make_orders, write_info_csv  # noqa: E402
+
+LOOKUPS = 200  # число поисков find_material_price на один замер
+LOOKUP_NAMES = ["опал", "copper 0.8", "латунная", "нет такого", "pearl", "нейзильбер 2"]
+
+
+def bench_cost(size, workdir):
+    orders = make_orders(size)
+    return size, lambda: [calculate_jewelry_cost(o) for o in orders]
+
+
+def bench_load(size, workdir):
+    path = _info_csv(size, workdir)
+    return size, lambda: load_materials_from_csv(path)
+
+
+def bench_find(size, workdir):
+    materials = MaterialCatalog(load_materials_from_csv(_info_csv(size, workdir)))
+    names = [LOOKUP_NAMES[i % len(LOOKUP_NAMES)] for i in range(LOOKUPS)]
+    return LOOKUPS, lambda: [find_material_price(materials, n) for n in names]
+
+
+def bench_filtered(size, workdir):
+    path = _info_csv(size, workdir)
+    return size, lambda: get_filtered_materials(path)
+
+
+def bench_short_rebuild(size, workdir):
+    path = _info_csv(size, workdir)
+    dst = os.path.join(workdir, f"short_{size}.csv")
+    return size, lambda: build_short_materials(path, dst)
+
+
+def bench_description(size, workdir):
+    orders = make_orders(size)
+    return size, lambda: [
+        render_description("кольцо", o.materials, o.materials[1:], "бохо", "подарок", "", "5-10", 2741)
+        for o in orders
+    ]
+
+
+BENCHMARKS = {
+    "calculate_jewelry_cost": bench_cost,
+    "load_materials_from_csv": bench_load,
+    "find_material_price": bench_find,
+    "get_filtered_materials": bench_filtered,
+    "make_short_materials_csv": bench_short_rebuild,
+    "generate_instagram_description": bench_description,
+}
+
+
+def _info_csv(size, workdir):
+    path = os.path.join(workdir, f"info_{size}.csv")
+    if not os.path.exists(path):
+        write_info_csv(path, size)
+    return path
+
+
+def measure(name, size, workdir, repeat):
+    """Лучшее время из repeat запусков и пиковая память отдельного запуска под tracemalloc."""
+    items, fn = BENCHMARKS[name](size, workdir)
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        t = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t
+        best = dt if best is None else min(best, dt)
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "benchmark": name,
+        "size": size,
+        "seconds": best,
+        "items_per_sec": items / best if best else None,
+        "peak_mb": peak / 2**20,
+    }
+
+
+def cmd_run(args):
+    sizes = [int(s) for s in args.sizes.split(",")]
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in names:
+            for size in sizes:
+                r = measure(name, size, workdir, args.repeat)
+                results.append(r)
+                print(f"{name:32s} {size:>9d}  {r['seconds']*1000:10.2f} мс  "
+                      f"{r['items_per_sec']:14.0f} шт/с  {r['peak_mb']:8.2f} МБ", flush=True)
+    report = {"python": platform.python_version(), "platform": platform.platform(), "results": results}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Результаты сохранены в {args.out}")
+
+
+def cmd_compare(args):
+    with open(args.baseline, encoding="utf-8") as f:
+        base = {(r["benchmark"], r["size"]): r for r in json.load(f)["results"]}
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)["results"]
+    regressions = 0
+    for r in current:
+        b = base.get((r["benchmark"], r["size"]))
+        if b is None:
+            continue
+        time_ratio = r["seconds"] / b["seconds"] if b["seconds"] else 1.0
+        mem_ratio = r["peak_mb"] / b["peak_mb"] if b["peak_mb"] else 1.0
+        slow = time_ratio > 1 + args.threshold or mem_ratio > 1 + args.threshold
+        regressions += slow
+        mark = "РЕГРЕССИЯ" if slow else "ok"
+        print(f"{r['benchmark']:32s} {r['size']:>9d}  время ×{time_ratio:5.2f}  память ×{mem_ratio:5.2f}  {mark}")
+    print(f"\nРегрессий: {regressions}")
+    sys.exit(1 if regressions else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="запустить бенчмарки")
+    run.add_argument("--sizes", default="100,1000,10000,100000",
+                     help="размеры через запятую (до 1000000)")
+    run.add_argument("--only", help="имена бенчмарков через запятую: " + ", ".join(BENCHMARKS))
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--out", help="файл JSON для результатов")
+    run.set_defaults(func=cmd_run)
+    compare = sub.add_parser("compare", help="сравнить результаты с базовыми")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.2,
+                         help="допустимое относительное ухудшение (0.2 = 20%%)")
+    compare.set_defaults(func=cmd_compare)
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Генераторы синтетических данных для бенчмарков: каталоги формата info.csv и заказы."""
+import csv
+import random
+
+from jewelry_cost_calculator import Consumable, JewelryCostInput, Material, WorkTime
+
+INFO_COLUMNS = ["Name", "Цена тенге", "1 piece", "1 gram", "tags ", "ссылка", "gramm", "Колличество", "Date"]
+
+_WIRES = ["Gauge Copper {d} mm", "Латунная проволока {d}", "Проволока нейзильбер {d} mm",
+          "Square Copper Wire {d}", "Медь для пайки {d}", "Solid Brass Wire {d}"]
+_STONES = ["Opal", "Turmaline", "Pearl", "Agat", "Агат мяско", "Natural Aquamarine",
+           "Black onyx", "Лабрадорит", "Garnet Stone Beads Gravel Chip", "Apatite"]
+_TOOLS = ["Flat-Nose Pliers", "КРУГЛОГУБЦЫ", "Ring Enlarger Stick Mandrel"]
+
+
+def write_info_csv(path: str, rows: int, seed: int = 0) -> None:
+    """Пишет каталог в формате info.csv заданного размера."""
+    rnd = random.Random(seed)
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(INFO_COLUMNS)
+        for i in range(rows):
+            kind = rnd.random()
+            price = rnd.randint(500, 5000)
+            if kind < 0.45:
+                name = f"{i} " + rnd.choice(_WIRES).format(d=rnd.choice([0.3, 0.5, 0.8, 1, 2]))
+                gramm = rnd.randint(5, 80)
+                qty = rnd.randint(1, 10)
+                writer.writerow([name, price, price / qty, price / gramm, "wire", "", gramm, qty, ""])
+            elif kind < 0.9:
+                name = rnd.choice(_STONES)
+                if rnd.random() < 0.5:
+                    qty = rnd.randint(5, 100)
+                    writer.writerow([name, price, price / qty, "", "stone", "", "", qty, ""])
+                else:
+                    gramm = rnd.randint(5, 100)
+                    writer.writerow([name, price, "", price / gramm, "stone", "", gramm, "", ""])
+            else:
+                writer.writerow([rnd.choice(_TOOLS), price, "", "", "tool", "", "", "", ""])
+
+
+def make_orders(count: int, seed: int = 0):
+    """Список JewelryCostInput с 1–4 материалами и стандартными расходниками."""
+    rnd = random.Random(seed)
+    catalog = [("Медь (средняя)", 22.4, "г"), ("Латунь (средняя)", 110.07, "г"),
+               ("Опал", 35.04, "г"), ("Жемчуг", 61.33, "шт"), ("Агат мяско", 246.17, "шт")]
+    consumables = [
+        Consumable(name="Расходники (шлифовка, воск, упаковка)", approx_cost=350),
+        Consumable(name="Электричество", approx_cost=20),
+        Consumable(name="Амортизация инструмента", approx_cost=125),
+    ]
+    orders = []
+    for _ in range(count):
+        materials = [Material(name=n, unit_price=p, quantity=rnd.randint(1, 10), unit=u)
+                     for n, p, u in rnd.sample(catalog, rnd.randint(1, 4))]
+        orders.append(JewelryCostInput(
+            materials=materials,
+            consumables=consumables,
+            work_time=WorkTime(hours=rnd.choice([0.5, 1, 2, 3.5]), hourly_rate=rnd.choice([1000, 1500, 2000])),
+            defect_percent=rnd.choice([0, 5]),
+        ))
+    return orders
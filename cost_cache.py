@@ -0,0 +1,261 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence
+
+from jewelry_cost_calculator import JewelryCostInput, JewelryCostResult, calculate_jewelry_cost, cost_input_to_dict
+from material_catalog import file_sha256
+from profiling import count
+
+DEFAULT_MAXSIZE = 4096
+DEFAULT_DISK_BYTES = 64 * 1024 * 1024
+CACHE_VERSION = 2
+
+DISK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    catalog TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_used ON results(used);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+TOUCH_BATCH = 256  # отметки использования копятся в памяти и пишутся одной транзакцией
+
+
+def cost_input_key(data: JewelryCostInput, currencies: Sequence[str] = (), variant: str = "") -> str:
+    """
+    Ключ расчёта: sha256 JSON-формы JewelryCostInput (порядок материалов важен —
+    он определяет порядок строк в детализации) вместе с валютами и их курсами.
+    Числа не нормализуются: 3 и 3.0 дают разные подписи в детализации («3 г» и «3.0 г»).
+    """
+    payload = {"v": CACHE_VERSION, "input": cost_input_to_dict(data), "variant": variant}
+    if currencies:
+        from currency import get_rates
+        rates = get_rates()
+        payload["rates"] = {code: rates.rate(code) for code in currencies}
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+_versions: Dict[str, tuple] = {}
+
+
+def catalog_version(csv_path: str) -> str:
+    """Версия каталога цен — sha256 файла; пересчитывается только при изменении mtime/размера."""
+    key = os.path.abspath(csv_path)
+    st = os.stat(csv_path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _versions.get(key)
+    if cached is None or cached[0] != stamp:
+        cached = _versions[key] = (stamp, file_sha256(csv_path))
+    return cached[1]
+
+
+class DiskStore:
+    """
+    SQLite-хранилище результатов с вытеснением давно не использованных записей по размеру.
+    Суммарный размер записей хранится в таблице meta и меняется в той же транзакции,
+    что и сами записи, поэтому запись не пересчитывает его по всей таблице,
+    а несколько процессов с одним файлом видят общий итог.
+    Отметки использования при чтении не пишутся сразу: они копятся и сбрасываются
+    вместе с ближайшей записью, пачкой по TOUCH_BATCH или при close().
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_DISK_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA synchronous = NORMAL')  # кэш: после сбоя можно потерять лишь последние записи
+        self.conn.executescript(DISK_SCHEMA)
+        with self.conn:
+            # хранилища, созданные до появления meta, считаются один раз
+            self.conn.execute(
+                "INSERT OR IGNORE INTO meta (name, value) "
+                "SELECT 'bytes', COALESCE(SUM(size), 0) FROM results"
+            )
+        self.evictions = 0
+        self._touched: Dict[str, float] = {}
+
+    def close(self) -> None:
+        if self._touched:
+            with self.conn:
+                self._flush_touched()
+        self.conn.close()
+
+    def get(self, key: str, catalog: str) -> Optional[JewelryCostResult]:
+        row = self.conn.execute('SELECT catalog, value, size FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        if row[0] != catalog:
+            with self.conn:
+                self._delete(key, row[2])
+            return None
+        self._touched[key] = time.time()
+        if len(self._touched) >= TOUCH_BATCH:
+            with self.conn:
+                self._flush_touched()
+        try:
+            return pickle.loads(row[1])
+        except (pickle.UnpicklingError, EOFError, AttributeError, TypeError):
+            return None
+
+    def put(self, key: str, catalog: str, result: JewelryCostResult) -> None:
+        value = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        with self.conn:
+            self._flush_touched()
+            old = self.conn.execute('SELECT size FROM results WHERE key = ?', (key,)).fetchone()
+            self.conn.execute(
+                'INSERT OR REPLACE INTO results (key, catalog, value, size, used) VALUES (?,?,?,?,?)',
+                (key, catalog, value, len(value), time.time()),
+            )
+            self._add_bytes(len(value) - (old[0] if old else 0))
+            self._evict()
+
+    def _flush_touched(self) -> None:
+        """Пишет накопленные отметки использования (вызывается внутри транзакции)."""
+        if self._touched:
+            self.conn.executemany('UPDATE results SET used = ? WHERE key = ?',
+                                  [(used, key) for key, used in self._touched.items()])
+            self._touched.clear()
+
+    def _add_bytes(self, delta: int) -> None:
+        if delta:
+            self.conn.execute("UPDATE meta SET value = value + ? WHERE name = 'bytes'", (delta,))
+
+    def _delete(self, key: str, size: int) -> None:
+        if self.conn.execute('DELETE FROM results WHERE key = ?', (key,)).rowcount:
+            self._add_bytes(-size)
+        self._touched.pop(key, None)
+
+    def _evict(self) -> None:
+        total = self.nbytes()
+        if total <= self.max_bytes:
+            return
+        # освобождаем с запасом в четверть лимита, чтобы не вытеснять на каждой записи
+        target = total - self.max_bytes * 3 // 4
+        freed = 0
+        victims = []
+        for key, size in self.conn.execute('SELECT key, size FROM results ORDER BY used'):
+            if freed >= target:
+                break
+            victims.append((key,))
+            freed += size
+        self.conn.executemany('DELETE FROM results WHERE key = ?', victims)
+        self._add_bytes(-freed)
+        for (key,) in victims:
+            self._touched.pop(key, None)
+        self.evictions += len(victims)
+
+    def purge(self, catalog: str) -> int:
+        """Удаляет записи, посчитанные по другой версии каталога."""
+        with self.conn:
+            freed = self.conn.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM results WHERE catalog != ?', (catalog,)
+            ).fetchone()[0]
+            removed = self.conn.execute('DELETE FROM results WHERE catalog != ?', (catalog,)).rowcount
+            self._add_bytes(-freed)
+        return removed
+
+    def nbytes(self) -> int:
+        return self.conn.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone()[0]
+
+
+class CostCache:
+    """
+    Мемоизация calculate_jewelry_cost: LRU в памяти на maxsize записей
+    и, если задан disk_path, SQLite-хранилище не больше disk_bytes.
+    Все записи привязаны к версии каталога цен: записи на диске с другой версией удаляются
+    при открытии хранилища и при её смене (set_catalog_version), тогда же очищается память.
+    Результаты отдаются как есть — не изменяйте их на месте.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, disk_path: Optional[str] = None,
+                 disk_bytes: int = DEFAULT_DISK_BYTES, catalog: str = ""):
+        self.maxsize = maxsize
+        self.catalog = catalog
+        self.memory: "OrderedDict[str, JewelryCostResult]" = OrderedDict()
+        self.disk = DiskStore(disk_path, disk_bytes) if disk_path else None
+        if self.disk is not None:
+            self.disk.purge(catalog)  # записи прошлых запусков по другой версии каталога
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+    def set_catalog_version(self, catalog: str) -> None:
+        if catalog == self.catalog:
+            return
+        self.catalog = catalog
+        self.invalidations += 1
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.purge(catalog)
+
+    def get(self, key: str) -> Optional[JewelryCostResult]:
+        result = self.memory.get(key)
+        if result is not None:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            count("cost_cache_hits")
+            return result
+        if self.disk is not None:
+            result = self.disk.get(key, self.catalog)
+            if result is not None:
+                self._remember(key, result)
+                self.hits += 1
+                self.disk_hits += 1
+                count("cost_cache_hits")
+                return result
+        self.misses += 1
+        count("cost_cache_misses")
+        return None
+
+    def put(self, key: str, result: JewelryCostResult) -> None:
+        self._remember(key, result)
+        if self.disk is not None:
+            self.disk.put(key, self.catalog, result)
+
+    def _remember(self, key: str, result: JewelryCostResult) -> None:
+        self.memory[key] = result
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+
+    def calculate(self, data: JewelryCostInput, currencies: Sequence[str] = ()) -> JewelryCostResult:
+        """calculate_jewelry_cost с мемоизацией."""
+        key = cost_input_key(data, currencies)
+        result = self.get(key)
+        if result is None:
+            result = calculate_jewelry_cost(data, tuple(currencies))
+            self.put(key, result)
+        return result
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        stats = {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self.memory),
+            "invalidations": self.invalidations,
+        }
+        if self.disk is not None:
+            stats["disk_bytes"] = self.disk.nbytes()
+            stats["disk_evictions"] = self.disk.evictions
+        return stats
@@ -0,0 +1,97 @@
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_RATES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rates.json')
+DEFAULT_TTL = 3600.0  # секунд, после которых файл курсов перечитывается
+
+# Как показывать валюты в описании: символ после числа и число знаков после запятой
+CURRENCY_SYMBOLS = {"USD": "$", "EUR": "€", "RUB": "₽"}
+CURRENCY_DECIMALS = {"KGS": 0, "RUB": 0, "KZT": 0}
+
+
+@dataclass(frozen=True)
+class RateTable:
+    """Курсы валют из локального файла: сколько единиц валюты стоит 1 единица base (тенге)."""
+    base: str
+    rates: Dict[str, float]
+    updated: str = ""
+
+    def rate(self, code: str) -> float:
+        try:
+            return self.rates[code]
+        except KeyError:
+            raise ValueError(f"Нет курса {self.base}->{code} в файле курсов.") from None
+
+    def convert(self, amount: float, currencies: Sequence[str]) -> Dict[str, float]:
+        """Пересчёт одной суммы в несколько валют."""
+        return {code: amount * self.rate(code) for code in currencies}
+
+
+def load_rates(path: str = DEFAULT_RATES_PATH) -> RateTable:
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return RateTable(base=data.get("base", "KZT"),
+                     rates={k: float(v) for k, v in data["rates"].items()},
+                     updated=data.get("updated", ""))
+
+
+_cache: Dict[str, Tuple[float, RateTable]] = {}
+
+
+def get_rates(path: Optional[str] = None, ttl: float = DEFAULT_TTL) -> RateTable:
+    """
+    Курсы с мемоизацией: файл читается один раз и повторно — только после истечения ttl
+    или явного refresh_rates(). На горячем пути чтения файлов нет.
+    """
+    path = path or DEFAULT_RATES_PATH
+    cached = _cache.get(path)
+    now = time.monotonic()
+    if cached is not None and now - cached[0] < ttl:
+        return cached[1]
+    return refresh_rates(path)
+
+
+def refresh_rates(path: Optional[str] = None) -> RateTable:
+    """Принудительно перечитывает файл курсов."""
+    path = path or DEFAULT_RATES_PATH
+    table = load_rates(path)
+    _cache[path] = (time.monotonic(), table)
+    return table
+
+
+def convert_amounts(amounts, currencies: Sequence[str], rates: Optional[RateTable] = None) -> dict:
+    """
+    Векторный пересчёт: amounts — массив любой формы (например, (n, 3) рекомендуемых цен пачки).
+    Возвращает {валюта: массив той же формы}; всё считается одним умножением на вектор курсов.
+    """
+    import numpy as np
+    rates = rates or get_rates()
+    arr = np.asarray(amounts, dtype=np.float64)
+    factors = np.array([rates.rate(c) for c in currencies], dtype=np.float64)
+    converted = arr[..., None] * factors
+    return {code: converted[..., k] for k, code in enumerate(currencies)}
+
+
+def format_amount(value: float, code: str) -> str:
+    """Сумма в валюте для таблицы цен: '18.89 USD', '1659 KGS'."""
+    decimals = CURRENCY_DECIMALS.get(code, 2)
+    return f"{value:.{decimals}f} {code}"
+
+
+def format_approx(value: float, code: str) -> str:
+    """Примерная цена для описания: '~5.6$' или '~1659 KGS'."""
+    symbol = CURRENCY_SYMBOLS.get(code)
+    if symbol:
+        return f"~{value:.1f}{symbol}"
+    return f"~{value:.{CURRENCY_DECIMALS.get(code, 1)}f} {code}"
+
+
+def approx_prices(amount: float, currencies: Sequence[str], rates: Optional[RateTable] = None) -> List[str]:
+    """Начальная цена в тенге, пересчитанная и отформатированная для строк «💲 Цена: ...»."""
+    if not currencies:
+        return []
+    rates = rates or get_rates()
+    return [format_approx(value, code) for code, value in rates.convert(amount, currencies).items()]
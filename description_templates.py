@@ -0,0 +1,122 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, Mapping, Sequence
+
+METAL_KEYWORDS = ('медь', 'латунь', 'нейзильбер')
+
+DEFAULT_HASHTAGS = (
+    "#украшенияручнойработы #авторскиеукрашения #ручнаяработа #медь #кафф #кольцо #брошь "
+    "#жемчуг #стиль #магия #handmadejewelry #earcuff #copperjewelry #baroquepearl "
+    "#uniquejewelry #slowmade #natureinspired #giftideas #madeinkazakhstan #authorjewelry "
+    "#jewelry #artisanjewelry #oneofakind #naturejewelry #craftwithlove #exclusivejewelry"
+)
+
+# Хэштеги для отдельных типов изделий (ключ — тип в нижнем регистре)
+HASHTAGS_BY_TYPE: Dict[str, str] = {}
+
+RU_BODY = "\nКаждая деталь выполнена вручную, с вниманием к текстуре и свету.\n\n📐 Размер: "
+RU_PRICE = "\n💰 Цена: "
+RU_TAIL = "\n\nВ наличии — пишите в директ, если тронуло ваше сердечко 💌\n\n---\n\n"
+EN_BODY = "\nEach detail is handcrafted with care for texture and light.\n\n📐 Size: "
+EN_PRICE = "\n💰 Price: "
+PRICE_END = "₸"
+# Строки примерной цены в других валютах сразу под ценой в тенге: «💲 Цена: ~5.6$»
+ALT_PRICE = "\n💲 {label}: {price}"
+EN_TAIL = ("\n\nThis one-of-a-kind piece is available — message me if it speaks to you 💌\n"
+           "\n🧷 Хэштеги / Hashtags:\n")
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """Неизменяемые части описания для одного типа изделия."""
+    ru_head: str
+    en_head: str
+    hashtags: str
+
+
+@lru_cache(maxsize=256)
+def compile_template(jewelry_type: str) -> CompiledTemplate:
+    """Собирает статические RU/EN фрагменты для типа изделия (один раз на тип)."""
+    title = jewelry_type.capitalize()
+    return CompiledTemplate(
+        ru_head=f"🌿 {title}\n\n{title} — смелый акцент и магия линий, вдохновлённая силой природы и мистикой. ",
+        en_head=f"🌲 {title} (Ear cuff / Ring / Brooch / etc.)\n\nInspired by the power of nature and a touch of mystery. ",
+        hashtags=HASHTAGS_BY_TYPE.get(jewelry_type.lower(), DEFAULT_HASHTAGS),
+    )
+
+
+@lru_cache(maxsize=4096)
+def is_metal_name(name: str) -> bool:
+    lower = name.lower()
+    return any(k in lower for k in METAL_KEYWORDS)
+
+
+def format_price(price) -> str:
+    """Цена с пробелами между разрядами: 12345 -> '12 345'."""
+    return f"{price:,}".replace(",", " ")
+
+
+def alt_price_lines(label: str, alt_prices: Sequence[str]) -> str:
+    """Строки «💲 Цена: ~5.6$» для уже отформатированных цен в других валютах."""
+    return ''.join(ALT_PRICE.format(label=label, price=p) for p in alt_prices)
+
+
+def render_description(jewelry_type, materials, stones, style, features, photo_path, size, start_price,
+                       alt_prices: Sequence[str] = ()) -> str:
+    """
+    Описание для Instagram (RU + EN + хэштеги) — одна склейка заранее собранных частей.
+    alt_prices — начальная цена в других валютах, уже отформатированная (см. currency.format_approx).
+    Без alt_prices результат совпадает с прежней generate_instagram_description.
+    """
+    tpl = compile_template(jewelry_type)
+    mat_str = ', '.join([m.name for m in materials if is_metal_name(m.name)])
+    stone_str = ', '.join([m.name for m in stones])
+    price = format_price(start_price)
+    ru_fields = []
+    en_fields = []
+    if mat_str:
+        ru_fields.append(f"Материалы: {mat_str}. ")
+        en_fields.append(f"Materials: {mat_str}. ")
+    if stone_str:
+        ru_fields.append(f"Камни: {stone_str}. ")
+        en_fields.append(f"Stones: {stone_str}. ")
+    if style:
+        ru_fields.append(f"Стиль: {style}. ")
+        en_fields.append(f"Style: {style}. ")
+    if features:
+        ru_fields.append(f"Особенности: {features}. ")
+        en_fields.append(f"Features: {features}. ")
+    parts = [
+        tpl.ru_head, *ru_fields, RU_BODY, str(size), RU_PRICE, price, PRICE_END,
+        alt_price_lines("Цена", alt_prices), RU_TAIL,
+        tpl.en_head, *en_fields, EN_BODY, str(size), EN_PRICE, price, PRICE_END,
+        alt_price_lines("Price", alt_prices), EN_TAIL,
+        tpl.hashtags,
+    ]
+    if photo_path:
+        parts.append(f"\nФото: {photo_path}")
+    return ''.join(parts)
+
+
+def iter_descriptions(pieces: Iterable[Mapping]) -> Iterator[str]:
+    """
+    Потоковая генерация описаний: принимает итерируемое словарей с ключами
+    аргументов render_description и выдаёт описания по одному, не держа их все в памяти.
+    """
+    for piece in pieces:
+        yield render_description(
+            piece['jewelry_type'], piece.get('materials', ()), piece.get('stones', ()),
+            piece.get('style', ''), piece.get('features', ''), piece.get('photo_path', ''),
+            piece.get('size', ''), piece['start_price'], piece.get('alt_prices', ()),
+        )
+
+
+def write_descriptions(pieces: Iterable[Mapping], stream, separator: str = "\n\n") -> int:
+    """Пишет описания в поток по мере генерации. Возвращает число описаний."""
+    count = 0
+    for desc in iter_descriptions(pieces):
+        if count:
+            stream.write(separator)
+        stream.write(desc)
+        count += 1
+    return count
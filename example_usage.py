@@ -1,188 +1,356 @@
-import pandas as pd
+import argparse
+import csv
+import json
+import multiprocessing
 import os
+import sys
 from datetime import datetime
+import profiling
+from profiling import span
+from cost_cache import CostCache, catalog_version
+from currency import approx_prices, format_amount, get_rates
+from description_templates import is_metal_name, render_description
 from jewelry_cost_calculator import (
-    Material, Consumable, WorkTime, JewelryCostInput, calculate_jewelry_cost
+    Material, Consumable, WorkTime, JewelryCostInput, calculate_jewelry_cost, read_materials_csv
 )
+from piece_files import get_start_price, piece_record, render_piece_markdown
+from piece_writer import PieceWriter
 
-def generate_instagram_description(jewelry_type, materials, stones, style, features, photo_path, size, start_price):
-    mat_str = ', '.join([m.name for m in materials if 'медь' in m.name.lower() or 'латунь' in m.name.lower() or 'нейзильбер' in m.name.lower()])
-    stone_str = ', '.join([m.name for m in stones])
-    # RU
-    ru_desc = f"🌿 {jewelry_type.capitalize()}"
-    ru_desc += f"\n\n"
-    ru_desc += f"{jewelry_type.capitalize()} — смелый акцент и магия линий, вдохновлённая силой природы и мистикой. "
-    if mat_str:
-        ru_desc += f"Материалы: {mat_str}. "
-    if stone_str:
-        ru_desc += f"Камни: {stone_str}. "
-    if style:
-        ru_desc += f"Стиль: {style}. "
-    if features:
-        ru_desc += f"Особенности: {features}. "
-    ru_desc += "\nКаждая деталь выполнена вручную, с вниманием к текстуре и свету.\n"
-    ru_desc += f"\n📐 Размер: {size}"
-    ru_desc += f"\n💰 Цена: {start_price:,}₸".replace(",", " ")
-    ru_desc += "\n\nВ наличии — пишите в директ, если тронуло ваше сердечко 💌\n"
-    # EN
-    en_desc = f"🌲 {jewelry_type.capitalize()} (Ear cuff / Ring / Brooch / etc.)\n\n"
-    en_desc += f"Inspired by the power of nature and a touch of mystery. "
-    if mat_str:
-        en_desc += f"Materials: {mat_str}. "
-    if stone_str:
-        en_desc += f"Stones: {stone_str}. "
-    if style:
-        en_desc += f"Style: {style}. "
-    if features:
-        en_desc += f"Features: {features}. "
-    en_desc += "\nEach detail is handcrafted with care for texture and light.\n"
-    en_desc += f"\n📐 Size: {size}"
-    en_desc += f"\n💰 Price: {start_price:,}₸".replace(",", " ")
-    en_desc += "\n\nThis one-of-a-kind piece is available — message me if it speaks to you 💌\n"
-    hashtags = "#украшенияручнойработы #авторскиеукрашения #ручнаяработа #медь #кафф #кольцо #брошь #жемчуг #стиль #магия #handmadejewelry #earcuff #copperjewelry #baroquepearl #uniquejewelry #slowmade #natureinspired #giftideas #madeinkazakhstan #authorjewelry #jewelry #artisanjewelry #oneofakind #naturejewelry #craftwithlove #exclusivejewelry"
-    desc = f"{ru_desc}\n---\n\n{en_desc}\n🧷 Хэштеги / Hashtags:\n{hashtags}"
-    if photo_path:
-        desc += f"\nФото: {photo_path}"
-    return desc
-
-# Загружаем сокращённый список материалов
-short_df = pd.read_csv('short_materials.csv')
-short_df = short_df.dropna(subset=['Цена'])  # Только с ценой
-short_df = short_df.drop_duplicates(subset=['Название', 'Ед.изм.'])
-
-print("\nДоступные материалы:")
-for idx, row in short_df.iterrows():
-    print(f"{idx+1}. {row['Название']} — {row['Цена']} тг/{row['Ед.изм.']}")
-
-selected = []
-stones = []
-while True:
-    choice = input("\nВведите номер материала (или Enter для завершения): ").strip()
-    if not choice:
-        break
-    if not choice.isdigit() or not (1 <= int(choice) <= len(short_df)):
-        print("Некорректный номер. Попробуйте снова.")
-        continue
-    idx = int(choice) - 1
-    row = short_df.iloc[idx]
-    qty = input(f"  Введите количество для '{row['Название']}' (в {row['Ед.изм.']}): ").replace(",", ".").strip()
-    try:
-        qty = float(qty)
-        if qty <= 0:
-            print("  Количество должно быть положительным!")
-            continue
-    except ValueError:
-        print("  Некорректное количество!")
-        continue
-    mat = Material(
-        name=row['Название'],
-        unit_price=float(row['Цена']),
-        quantity=qty,
-        unit=row['Ед.изм.']
+def generate_instagram_description(jewelry_type, materials, stones, style, features, photo_path, size, start_price,
+                                   currencies=()):
+    with span("description"):
+        return render_description(
+            jewelry_type, materials, stones, style, features, photo_path, size, start_price,
+            approx_prices(start_price, currencies)
+        )
+
+def load_short_materials(csv_path='short_materials.csv'):
+    """Загружает сокращённый список материалов (только с ценой, без дублей)."""
+    return read_materials_csv(csv_path)
+
+def is_stone(material):
+    """Камнем считается всё, что не металл."""
+    return not is_metal_name(material.name)
+
+def default_consumables():
+    return [
+        Consumable(name="Расходники (шлифовка, воск, упаковка)", approx_cost=350),
+        Consumable(name="Электричество", approx_cost=20),
+        Consumable(name="Амортизация инструмента", approx_cost=125),
+        Consumable(name="Цаполак (лак для металла)", approx_cost=50),
+    ]
+
+def build_cost_input(selected, hours, hourly_rate):
+    return JewelryCostInput(
+        materials=selected,
+        consumables=default_consumables(),
+        work_time=WorkTime(hours=hours, hourly_rate=hourly_rate),
+        electricity_cost=0,  # уже учтено в consumables
+        tool_depreciation=0, # уже учтено в consumables
+        packaging_cost=0,    # уже учтено в consumables
+        defect_percent=0,    # не учитываем брак для чистоты примера
+    )
+
+# ---------- Пакетный режим ----------
+
+_price_table = None
+_cost_cache = None
+
+def make_cost_cache(materials_csv, cache_path=None):
+    """Кэш расчётов, привязанный к версии файла цен (с диском, если задан cache_path)."""
+    return CostCache(disk_path=cache_path, catalog=catalog_version(materials_csv))
+
+def _init_worker(materials_csv, profile=False, currencies=(), cache_path=None):
+    """Инициализация процесса: таблица цен, курсы валют и кэш расчётов создаются один раз на процесс."""
+    global _price_table, _cost_cache
+    if profile:
+        profiling.enable()
+        profiling.reset()  # при fork процесс наследует замеры родителя
+    _price_table = build_price_table(load_short_materials(materials_csv))
+    if currencies:
+        get_rates()
+    _cost_cache = make_cost_cache(materials_csv, cache_path)
+
+def build_price_table(materials):
+    """Таблица цен для поиска по (название, ед.изм.) и по одному названию."""
+    table = {}
+    for m in materials:
+        table.setdefault((m.name, m.unit), m.unit_price)
+        table.setdefault((m.name, None), (m.unit_price, m.unit))
+    return table
+
+def lookup_material(price_table, name, unit=None):
+    profiling.count("lookups")
+    if unit:
+        price = price_table.get((name, unit))
+        if price is None:
+            raise ValueError(f"Материал '{name}' ({unit}) не найден в списке материалов.")
+        return price, unit
+    found = price_table.get((name, None))
+    if found is None:
+        raise ValueError(f"Материал '{name}' не найден в списке материалов.")
+    return found
+
+def parse_order_materials(value):
+    """
+    Материалы заказа: список {"name", "quantity", "unit"?}, словарь {название: количество}
+    или строка вида "Медь (средняя):3; Опал:2".
+    """
+    if isinstance(value, dict):
+        return [{'name': k, 'quantity': v} for k, v in value.items()]
+    if isinstance(value, str):
+        items = []
+        for part in value.split(';'):
+            part = part.strip()
+            if not part:
+                continue
+            name, _, qty = part.rpartition(':')
+            items.append({'name': name.strip(), 'quantity': qty.strip().replace(',', '.')})
+        return items
+    return value or []
+
+def load_orders(path):
+    """Читает заказы из JSONL или CSV (по расширению файла)."""
+    if path.lower().endswith('.csv'):
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            return list(csv.DictReader(f))
+    orders = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                orders.append(json.loads(line))
+    return orders
+
+def select_order_materials(order, price_table):
+    """Материалы заказа с ценами из таблицы. Возвращает (все материалы, камни)."""
+    selected = []
+    with span("material_filtering"):
+        for item in parse_order_materials(order.get('materials')):
+            price, unit = lookup_material(price_table, item['name'], item.get('unit'))
+            qty = float(item['quantity'])
+            if qty <= 0:
+                raise ValueError(f"Количество для '{item['name']}' должно быть положительным.")
+            selected.append(Material(name=item['name'], unit_price=price, quantity=qty, unit=unit))
+        if not selected:
+            raise ValueError("В заказе нет материалов.")
+        stones = [m for m in selected if is_stone(m)]
+    return selected, stones
+
+def render_order(order, today, currencies=()):
+    """Считает себестоимость заказа и собирает .md-файл в памяти. Возвращает (результат, тип, текст, запись)."""
+    selected, stones = select_order_materials(order, _price_table)
+    data = build_cost_input(selected, float(order['hours']), float(order['rate']))
+    result = _cost_cache.calculate(data, currencies)
+    jewelry_type = str(order.get('type', '')).strip()
+    photo_path = str(order.get('photo') or '').strip()
+    desc = generate_instagram_description(
+        jewelry_type, selected, stones, order.get('style', ''), order.get('features', ''),
+        photo_path, order.get('size', ''), get_start_price(result), currencies
     )
-    selected.append(mat)
-    # Если это камень (не металл), добавляем в stones
-    if not any(x in mat.name.lower() for x in ['медь', 'латунь', 'нейзильбер']):
-        stones.append(mat)
-    print(f"  Добавлено: {row['Название']} — {qty} {row['Ед.изм.']}")
-
-if not selected:
-    print("\nНе выбрано ни одного материала! Завершение.")
-    exit(0)
-
-# Запрашиваем ставку и время работы
-while True:
+    content = render_piece_markdown(jewelry_type, today, result, desc, photo_path)
+    return result, jewelry_type, content, piece_record(jewelry_type, today, data, currencies)
+
+def _quote_task(task):
+    """
+    Расчёт одного заказа в процессе-исполнителе. Файл не пишется здесь:
+    содержимое возвращается в основной процесс, где его сохраняет PieceWriter.
+    """
+    n, order, today, out_dir, currencies = task
     try:
-        hourly_rate = float(input("\nВведите ставку за час работы (тг): ").replace(",", "."))
-        if hourly_rate <= 0:
-            print("Ставка должна быть положительной!")
-            continue
-        break
-    except ValueError:
-        print("Некорректная ставка!")
+        result, jewelry_type, content, record = render_order(order, today, currencies)
+    except (KeyError, ValueError, TypeError) as e:
+        return n, None, None, f"{type(e).__name__}: {e}", _take_profile(), None, None
+    filename = os.path.join(out_dir, f"{jewelry_type.replace(' ', '_')}_{today}_{n}.md")
+    return n, filename, int(result.total_cost), None, _take_profile(), content, record
+
+def _take_profile():
+    """Замеры процесса-исполнителя для передачи в основной процесс (None, если выключено)."""
+    if not profiling.is_enabled():
+        return None
+    data = profiling.report()
+    profiling.reset()
+    return data
 
-while True:
+def run_batch(orders_path, materials_csv='short_materials.csv', out_dir='jewelry',
+              workers=None, ordered=True, chunksize=64, currencies=(), cache_path=None, fsync=True):
+    """
+    Пакетный расчёт заказов из файла. Работа распределяется по пулу процессов;
+    при ordered=False результаты выдаются по мере готовности.
+    Файлы пишет один фоновый PieceWriter основного процесса: атомарно и без совпадений имён.
+    Возвращает список (номер, файл, себестоимость, ошибка).
+    При включённом profiling замеры процессов-исполнителей сливаются в основной процесс.
+    """
+    with span("orders_parse"):
+        orders = load_orders(orders_path)
+    profiling.count("orders", len(orders))
+    today = datetime.now().strftime('%Y-%m-%d_%H-%M')
+    currencies = tuple(currencies)
+    tasks = [(n, order, today, out_dir, currencies) for n, order in enumerate(orders, 1)]
+    workers = workers or os.cpu_count() or 1
+    profile = profiling.is_enabled()
+    writer = PieceWriter(fsync=fsync)  # поток записи стартует при первом submit, уже после fork пула
     try:
-        hours = float(input("Введите затраченное время (часы): ").replace(",", "."))
-        if hours <= 0:
-            print("Время должно быть положительным!")
+        if workers == 1:
+            _init_worker(materials_csv, currencies=currencies, cache_path=cache_path)
+            results = map(_quote_task, tasks)
+            return [_report(r, writer) for r in results]
+        with multiprocessing.Pool(workers, initializer=_init_worker,
+                                  initargs=(materials_csv, profile, currencies, cache_path)) as pool:
+            imap = pool.imap if ordered else pool.imap_unordered
+            return [_report(r, writer) for r in imap(_quote_task, tasks, chunksize=chunksize)]
+    finally:
+        writer.close()  # время записи замеряется в самом PieceWriter (этап markdown_write)
+
+def _report(item, writer):
+    n, filename, total, error, profile, content, record = item
+    if profile:
+        profiling.merge(profile)
+    if error:
+        print(f"{n}. Ошибка: {error}")
+    else:
+        filename = writer.submit(filename, content, record)
+        print(f"{n}. {filename} — себестоимость {total} тг")
+    return n, filename, total, error
+
+# ---------- Интерактивный режим ----------
+
+def interactive(currencies=(), cache_path=None, materials_csv='short_materials.csv'):
+    available = load_short_materials(materials_csv)
+
+    print("\nДоступные материалы:")
+    for idx, m in enumerate(available):
+        print(f"{idx+1}. {m.name} — {m.unit_price} тг/{m.unit}")
+
+    selected = []
+    stones = []
+    while True:
+        choice = input("\nВведите номер материала (или Enter для завершения): ").strip()
+        if not choice:
+            break
+        if not choice.isdigit() or not (1 <= int(choice) <= len(available)):
+            print("Некорректный номер. Попробуйте снова.")
             continue
-        break
-    except ValueError:
-        print("Некорректное время!")
-
-# Вводим параметры для описания
-jewelry_type = input("\nТип изделия (например, браслет, кольцо, серьги): ").strip()
-size = input("Размер изделия (например, 3,5 см или 18 мм): ").strip()
-style = input("Стиль/настроение (например, минимализм, бохо, винтаж): ").strip()
-features = input("Особенности/для кого (например, подарок, женский, мужской): ").strip()
-photo_path = input("Путь к фото (или оставьте пустым): ").strip()
-
-consumables = [
-    Consumable(name="Расходники (шлифовка, воск, упаковка)", approx_cost=350),
-    Consumable(name="Электричество", approx_cost=20),
-    Consumable(name="Амортизация инструмента", approx_cost=125),
-    Consumable(name="Цаполак (лак для металла)", approx_cost=50),
-]
-
-work_time = WorkTime(hours=hours, hourly_rate=hourly_rate)
-
-data = JewelryCostInput(
-    materials=selected,
-    consumables=consumables,
-    work_time=work_time,
-    electricity_cost=0,  # уже учтено в consumables
-    tool_depreciation=0, # уже учтено в consumables
-    packaging_cost=0,    # уже учтено в consumables
-    defect_percent=0,    # не учитываем брак для чистоты примера
-)
+        item = available[int(choice) - 1]
+        qty = input(f"  Введите количество для '{item.name}' (в {item.unit}): ").replace(",", ".").strip()
+        try:
+            qty = float(qty)
+            if qty <= 0:
+                print("  Количество должно быть положительным!")
+                continue
+        except ValueError:
+            print("  Некорректное количество!")
+            continue
+        mat = Material(
+            name=item.name,
+            unit_price=item.unit_price,
+            quantity=qty,
+            unit=item.unit
+        )
+        selected.append(mat)
+        # Если это камень (не металл), добавляем в stones
+        if is_stone(mat):
+            stones.append(mat)
+        print(f"  Добавлено: {item.name} — {qty} {item.unit}")
 
-result = calculate_jewelry_cost(data)
-
-# Красивый вывод
-print("\nСебестоимость изделия (пересчитанная)")
-for name, cost in result.cost_breakdown.items():
-    print(f"- {name}: {int(cost)} тг")
-print(f"\nИтого себестоимость: {int(result.total_cost)} тг\n")
-print("Рекомендуемая цена продажи:")
-for label, price in result.recommended_prices.items():
-    print(f"- {label}: {int(price)} тг")
-print(f"\n{result.price_comment}")
-
-# Генерация описания для Instagram
-print("\n---\nОписание для Instagram:\n")
-# Получаем начальную цену (×1.5)
-start_price = None
-for label, price in result.recommended_prices.items():
-    if '1.5' in label or 'начал' in label.lower():
-        start_price = int(price)
-        break
-if start_price is None:
-    start_price = int(result.total_cost * 1.5)
-
-desc = generate_instagram_description(
-    jewelry_type, selected, stones, style, features, photo_path, size, start_price
-)
-print(desc)
-
-# Сохраняем всё в .md-файл
-os.makedirs('jewelry', exist_ok=True)
-today = datetime.now().strftime('%Y-%m-%d_%H-%M')
-filename = f"jewelry/{jewelry_type.replace(' ', '_')}_{today}.md"
-with open(filename, 'w', encoding='utf-8') as f:
-    f.write(f"# {jewelry_type}\n\n")
-    f.write(f"**Дата создания:** {today}\n\n")
-    f.write("## Себестоимость и затраты\n\n")
+    if not selected:
+        print("\nНе выбрано ни одного материала! Завершение.")
+        exit(0)
+
+    # Запрашиваем ставку и время работы
+    while True:
+        try:
+            hourly_rate = float(input("\nВведите ставку за час работы (тг): ").replace(",", "."))
+            if hourly_rate <= 0:
+                print("Ставка должна быть положительной!")
+                continue
+            break
+        except ValueError:
+            print("Некорректная ставка!")
+
+    while True:
+        try:
+            hours = float(input("Введите затраченное время (часы): ").replace(",", "."))
+            if hours <= 0:
+                print("Время должно быть положительным!")
+                continue
+            break
+        except ValueError:
+            print("Некорректное время!")
+
+    # Вводим параметры для описания
+    jewelry_type = input("\nТип изделия (например, браслет, кольцо, серьги): ").strip()
+    size = input("Размер изделия (например, 3,5 см или 18 мм): ").strip()
+    style = input("Стиль/настроение (например, минимализм, бохо, винтаж): ").strip()
+    features = input("Особенности/для кого (например, подарок, женский, мужской): ").strip()
+    photo_path = input("Путь к фото (или оставьте пустым): ").strip()
+
+    data = build_cost_input(selected, hours, hourly_rate)
+    if cache_path:
+        result = make_cost_cache(materials_csv, cache_path).calculate(data, currencies)
+    else:
+        result = calculate_jewelry_cost(data, currencies)
+
+    # Красивый вывод
+    print("\nСебестоимость изделия (пересчитанная)")
     for name, cost in result.cost_breakdown.items():
-        f.write(f"- {name}: {int(cost)} тг\n")
-    f.write(f"\n**Итого себестоимость:** {int(result.total_cost)} тг\n\n")
-    f.write("## Рекомендуемая цена продажи\n\n")
+        print(f"- {name}: {int(cost)} тг")
+    print(f"\nИтого себестоимость: {int(result.total_cost)} тг\n")
+    print("Рекомендуемая цена продажи:")
     for label, price in result.recommended_prices.items():
-        f.write(f"- {label}: {int(price)} тг\n")
-    f.write(f"\n{result.price_comment}\n\n")
-    f.write("---\n\n")
-    f.write("## Описание для Instagram\n\n")
-    f.write(desc + '\n')
-    if photo_path:
-        f.write(f"\n![]({photo_path})\n")
-print(f"\nВся информация сохранена в {filename}") 
\ No newline at end of file
+        alt = ', '.join(format_amount(v, code) for code, v in result.converted_prices.get(label, {}).items())
+        print(f"- {label}: {int(price)} тг" + (f" ({alt})" if alt else ""))
+    print(f"\n{result.price_comment}")
+
+    # Генерация описания для Instagram
+    print("\n---\nОписание для Instagram:\n")
+    start_price = get_start_price(result)
+
+    desc = generate_instagram_description(
+        jewelry_type, selected, stones, style, features, photo_path, size, start_price, currencies
+    )
+    print(desc)
+
+    # Сохраняем всё в .md-файл
+    today = datetime.now().strftime('%Y-%m-%d_%H-%M')
+    with PieceWriter() as writer:
+        filename = writer.submit(f"jewelry/{jewelry_type.replace(' ', '_')}_{today}.md",
+                                 render_piece_markdown(jewelry_type, today, result, desc, photo_path),
+                                 piece_record(jewelry_type, today, data, currencies))
+    print(f"\nВся информация сохранена в {filename}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Расчёт себестоимости и описания украшений')
+    parser.add_argument('--batch', metavar='FILE',
+                        help='файл заказов (JSONL или CSV) для пакетного режима без вопросов')
+    parser.add_argument('--materials', default='short_materials.csv', help='список материалов с ценами')
+    parser.add_argument('--out', default='jewelry', help='папка для .md-файлов')
+    parser.add_argument('--workers', type=int, default=None, help='число процессов (по умолчанию — число ядер)')
+    parser.add_argument('--unordered', action='store_true', help='выводить результаты по мере готовности')
+    parser.add_argument('--profile', nargs='?', const='-', metavar='FILE',
+                        help='записать JSON-отчёт о времени этапов (по умолчанию — в stdout)')
+    parser.add_argument('--cprofile', metavar='FILE', help='сохранить статистику cProfile')
+    parser.add_argument('--currencies', default='USD',
+                        help='валюты для цен через запятую по курсам из rates.json (пусто — только тенге)')
+    parser.add_argument('--no-fsync', action='store_true',
+                        help='не сбрасывать файлы на диск (быстрее, но при сбое питания файлы могут потеряться)')
+    parser.add_argument('--cache', metavar='FILE',
+                        help='SQLite-файл кэша расчётов между запусками (в памяти кэш работает всегда в пакетном режиме)')
+    args = parser.parse_args()
+    currencies = tuple(c.strip().upper() for c in args.currencies.split(',') if c.strip())
+    if args.profile:
+        profiling.enable()
+    with profiling.cprofile(args.cprofile), span("total"):
+        if args.batch:
+            results = run_batch(args.batch, args.materials, args.out, args.workers,
+                                ordered=not args.unordered, currencies=currencies, cache_path=args.cache,
+                                fsync=not args.no_fsync)
+            failed = sum(1 for r in results if r[3])
+            print(f"\nГотово: {len(results) - failed} из {len(results)}, ошибок: {failed}")
+        else:
+            interactive(currencies, args.cache, args.materials)
+    if args.profile:
+        profiling.write_report(args.profile, mode='batch' if args.batch else 'interactive', argv=sys.argv[1:])
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,29 @@
-from dataclasses import dataclass, field
-from typing import List, Dict, Optional
-import pandas as pd
+from dataclasses import asdict, dataclass, field
+from typing import List, Dict, Iterator, Optional, Tuple
+import csv
 import os
 
-@dataclass
+from profiling import count, span, timed
+
+# Значения, которые pandas.read_csv по умолчанию считает пустыми (NaN)
+_NA_VALUES = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+    "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+}
+
+# Наценки рекомендуемых цен (подпись, множитель) и розничный коэффициент для комментария
+PRICE_TIERS = (
+    ("Минимальная (×2)", 2),
+    ("Комфортная (×2.5)", 2.5),
+    ("Премиум (×3)", 3),
+)
+RETAIL_FACTOR = 1.1
+
+def price_comment(min_price: float, comfort_price: float) -> str:
+    return (f"👉 Отличная розничная цена: от {int(min_price*RETAIL_FACTOR)} до {int(comfort_price*RETAIL_FACTOR)} тг, "
+            "в зависимости от упаковки и позиционирования.")
+
+@dataclass(slots=True)
 class Material:
     name: str
     unit_price: float  # цена за единицу (грамм, штуку и т.д.)
@@ -13,12 +33,12 @@ class Material:
     def cost(self) -> float:
         return self.unit_price * self.quantity
 
-@dataclass
+@dataclass(slots=True)
 class Consumable:
     name: str
     approx_cost: float
 
-@dataclass
+@dataclass(slots=True)
 class WorkTime:
     hours: float
     hourly_rate: float
@@ -43,8 +63,28 @@ class JewelryCostResult:
     total_cost: float
     recommended_prices: Dict[str, float]
     price_comment: str
+    # Рекомендуемые цены в других валютах: {подпись: {код валюты: сумма}}
+    converted_prices: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+def cost_input_to_dict(data: JewelryCostInput) -> dict:
+    """Представление JewelryCostInput из простых типов (для JSON)."""
+    return asdict(data)
 
-def calculate_jewelry_cost(data: JewelryCostInput) -> JewelryCostResult:
+def cost_input_from_dict(d: dict) -> JewelryCostInput:
+    """Восстанавливает JewelryCostInput из результата cost_input_to_dict."""
+    return JewelryCostInput(
+        materials=[Material(**m) for m in d["materials"]],
+        consumables=[Consumable(**c) for c in d["consumables"]],
+        work_time=WorkTime(**d["work_time"]),
+        electricity_cost=d.get("electricity_cost", 0.0),
+        tool_depreciation=d.get("tool_depreciation", 0.0),
+        packaging_cost=d.get("packaging_cost", 0.0),
+        extra_costs=[Consumable(**c) for c in d.get("extra_costs", [])],
+        defect_percent=d.get("defect_percent", 0.0),
+    )
+
+@timed("cost_calculation")
+def calculate_jewelry_cost(data: JewelryCostInput, currencies: Tuple[str, ...] = ()) -> JewelryCostResult:
     breakdown = {}
     total = 0.0
     # Материалы
@@ -82,57 +122,125 @@ def calculate_jewelry_cost(data: JewelryCostInput) -> JewelryCostResult:
         breakdown[f"Брак ({data.defect_percent}%)"] = defect_cost
         total += defect_cost
     # Рекомендации по цене
-    min_price = total * 2
-    comfort_price = total * 2.5
-    premium_price = total * 3
-    recommended = {
-        "Минимальная (×2)": min_price,
-        "Комфортная (×2.5)": comfort_price,
-        "Премиум (×3)": premium_price
-    }
-    comment = f"👉 Отличная розничная цена: от {int(min_price*1.1)} до {int(comfort_price*1.1)} тг, в зависимости от упаковки и позиционирования."
+    recommended = {label: total * k for label, k in PRICE_TIERS}
+    min_price, comfort_price = recommended[PRICE_TIERS[0][0]], recommended[PRICE_TIERS[1][0]]
+    comment = price_comment(min_price, comfort_price)
+    converted = {}
+    if currencies:
+        from currency import get_rates  # курсы читаются из файла один раз и кешируются
+        rates = get_rates()
+        converted = {label: rates.convert(price, currencies) for label, price in recommended.items()}
     return JewelryCostResult(
         cost_breakdown=breakdown,
         total_cost=total,
         recommended_prices=recommended,
-        price_comment=comment
+        price_comment=comment,
+        converted_prices=converted
     )
 
-def load_materials_from_csv(csv_path: str = "info.csv") -> List[Material]:
+@timed("csv_parse")
+def load_materials_from_csv(csv_path: str = "info.csv", chunksize: Optional[int] = None) -> List[Material]:
     """
     Загружает материалы из CSV-файла и возвращает список объектов Material.
+    С chunksize файл читается кусками по chunksize строк, и в памяти одновременно
+    находится только один кусок DataFrame.
     """
     if not os.path.exists(csv_path):
         raise FileNotFoundError(f"Файл {csv_path} не найден.")
-    df = pd.read_csv(csv_path)
+    import pandas as pd
+    chunks = [pd.read_csv(csv_path)] if chunksize is None else pd.read_csv(csv_path, chunksize=chunksize)
     materials = []
-    for _, row in df.iterrows():
-        name = str(row.get("Name", "")).strip()
-        tag = str(row.get("tags ", "")).strip().lower()
-        # Определяем цену и единицу измерения
-        if pd.notnull(row.get("1 gram")) and float(row["1 gram"]) > 0:
-            unit_price = float(row["1 gram"])
-            unit = "г"
-        elif pd.notnull(row.get("1 piece")) and float(row["1 piece"]) > 0:
-            unit_price = float(row["1 piece"])
-            unit = "шт"
-        else:
-            continue  # Пропускаем, если нет цены
-        # По умолчанию количество = 0, пользователь укажет при расчёте
-        materials.append(Material(name=name, unit_price=unit_price, quantity=0, unit=unit))
+    for df in chunks:
+        for _, row in df.iterrows():
+            name = str(row.get("Name", "")).strip()
+            tag = str(row.get("tags ", "")).strip().lower()
+            # Определяем цену и единицу измерения
+            if pd.notnull(row.get("1 gram")) and float(row["1 gram"]) > 0:
+                unit_price = float(row["1 gram"])
+                unit = "г"
+            elif pd.notnull(row.get("1 piece")) and float(row["1 piece"]) > 0:
+                unit_price = float(row["1 piece"])
+                unit = "шт"
+            else:
+                continue  # Пропускаем, если нет цены
+            # По умолчанию количество = 0, пользователь укажет при расчёте
+            materials.append(Material(name=name, unit_price=unit_price, quantity=0, unit=unit))
+        count("rows_parsed", len(df))
     return materials
 
-def find_material_price(materials: List[Material], name: str) -> Optional[Material]:
+def csv_float(value: Optional[str]) -> Optional[float]:
+    """Число из ячейки CSV; пустые значения (как NaN в pandas) — None."""
+    if value is None or value in _NA_VALUES:
+        return None
+    return float(value)
+
+def iter_materials_csv(csv_path: str = "info.csv") -> Iterator[Tuple[str, float, str]]:
+    """
+    Построчно читает материалы из CSV без pandas (модуль csv стандартной библиотеки)
+    и выдаёт кортежи (название, цена за единицу, единица измерения).
+    Поддерживает два формата:
+    - info.csv (Name, 1 piece, 1 gram) — как в load_materials_from_csv;
+    - short_materials.csv (Название, Цена, Ед.изм.) — строки без цены и дубли
+      по (Название, Ед.изм.) отбрасываются.
+    """
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"Файл {csv_path} не найден.")
+    with open(csv_path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        if "Название" in (reader.fieldnames or []):
+            seen = set()
+            for row in reader:
+                price = csv_float(row.get("Цена"))
+                if price is None:
+                    continue
+                name, unit = row["Название"], row["Ед.изм."]
+                if (name, unit) in seen:
+                    continue
+                seen.add((name, unit))
+                yield name, price, unit
+            count("rows_parsed", reader.line_num - 1)
+            return
+        for row in reader:
+            raw_name = row.get("Name")
+            name = ("nan" if raw_name in _NA_VALUES else raw_name).strip() if raw_name is not None else ""
+            gram = csv_float(row.get("1 gram"))
+            piece = csv_float(row.get("1 piece"))
+            if gram is not None and gram > 0:
+                yield name, gram, "г"
+            elif piece is not None and piece > 0:
+                yield name, piece, "шт"
+            # иначе пропускаем — нет цены
+        count("rows_parsed", reader.line_num - 1)
+
+def read_materials_csv(csv_path: str = "info.csv") -> List[Material]:
+    """
+    Загружает материалы из CSV без pandas. Для info.csv результат совпадает
+    с load_materials_from_csv, для short_materials.csv — с сокращённым списком.
+    """
+    with span("csv_parse"):
+        return [
+            Material(name=name, unit_price=price, quantity=0, unit=unit)
+            for name, price, unit in iter_materials_csv(csv_path)
+        ]
+
+def find_material_price(materials, name: str) -> Optional[Material]:
     """
     Находит материал по имени (без учёта регистра, частичное совпадение).
     Возвращает объект Material с ценой и единицей измерения.
+    materials — material_catalog.MaterialCatalog (поиск по индексу n-грамм)
+    или список Material (перебор по порядку); результат в обоих случаях одинаковый.
     """
+    count("lookups")
+    from material_catalog import MaterialCatalog
+    if isinstance(materials, MaterialCatalog):
+        return materials.find(name)
     name = name.lower().strip()
     for m in materials:
         if name in m.name.lower():
             return m
     return None
 
+@timed("material_filtering")
 def get_filtered_materials(csv_path: str = "info.csv") -> list:
     """
     Возвращает сокращённый список материалов:
@@ -144,44 +252,9 @@ def get_filtered_materials(csv_path: str = "info.csv") -> list:
     Инструменты исключаются.
     """
     import pandas as pd
+    from material_aggregation import aggregate_filtered_rows
     df = pd.read_csv(csv_path)
-    result = []
-    # Медь (все варианты, кроме квадратной)
-    copper = df[df["Name"].str.lower().str.contains("медь") & ~df["Name"].str.lower().str.contains("square")]
-    if not copper.empty:
-        avg_price = copper["1 gram"].dropna().astype(float).mean()
-        if not pd.isna(avg_price):
-            result.append(Material(name="Медь (средняя)", unit_price=round(avg_price,2), quantity=0, unit="г"))
-    # Квадратная медь
-    sq_copper = df[df["Name"].str.lower().str.contains("square") & df["Name"].str.lower().str.contains("copper")]
-    if not sq_copper.empty:
-        avg_price = sq_copper["1 gram"].dropna().astype(float).mean()
-        if not pd.isna(avg_price):
-            result.append(Material(name="Квадратная медь (средняя)", unit_price=round(avg_price,2), quantity=0, unit="г"))
-    # Латунь
-    brass = df[df["Name"].str.lower().str.contains("латун")]
-    if not brass.empty:
-        avg_price = brass["1 gram"].dropna().astype(float).mean()
-        if not pd.isna(avg_price):
-            result.append(Material(name="Латунь (средняя)", unit_price=round(avg_price,2), quantity=0, unit="г"))
-    # Нейзильбер
-    neiz = df[df["Name"].str.lower().str.contains("нейз")]
-    if not neiz.empty:
-        avg_price = neiz["1 gram"].dropna().astype(float).mean()
-        if not pd.isna(avg_price):
-            result.append(Material(name="Нейзильбер (средняя)", unit_price=round(avg_price,2), quantity=0, unit="г"))
-    # Все камни на русском (stone, но имя на кириллице)
-    stones = df[(df["tags "]=="stone") & df["Name"].str.contains(r'[А-Яа-яЁё]', na=False)]
-    for _, row in stones.iterrows():
-        name = str(row["Name"]).strip()
-        price = None
-        unit = "шт"
-        if pd.notnull(row.get("1 piece")) and float(row["1 piece"]) > 0:
-            price = float(row["1 piece"])
-            unit = "шт"
-        elif pd.notnull(row.get("1 gram")) and float(row["1 gram"]) > 0:
-            price = float(row["1 gram"])
-            unit = "г"
-        if price:
-            result.append(Material(name=name, unit_price=round(price,2), quantity=0, unit=unit))
-    return result 
\ No newline at end of file
+    return [
+        Material(name=row['Название'], unit_price=row['Цена'], quantity=0, unit=row['Ед.изм.'])
+        for row in aggregate_filtered_rows(df)
+    ]
@@ -0,0 +1,287 @@
+import csv
+import hashlib
+import math
+import multiprocessing
+import os
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Ручной перевод английских названий камней
+STONE_TRANSLATE = {
+    'Turmaline': 'Турмалин',
+    'Electroplated quartz': 'Кварц',
+    'Opal': 'Опал',
+    'Green Apatite': 'Апатит зелёный',
+    'Lapis Lazuli': 'Лазурит',
+    'White Natural Freshwater Pearls': 'Белый натуральный жемчуг',
+    'Black Baroque Freshwater Pearl Beads': 'Чёрный барочный жемчуг',
+    'Garnet Stone Beads Gravel Chip': 'Гранат',
+    'Natural Aquamarine': 'Аквамарин',
+    'Onyx beads': 'Оникс',
+    'Black onyx': 'Чёрный оникс',
+    'Apatite': 'Апатит',
+    'Golden sand': 'Золотой песок',
+    'Pearl': 'Жемчуг',
+    'Phoenix': 'Феникс',
+    'Agat': 'Агат',
+    'Drop Shaped Glass Beads': 'Каплевидные стеклянные бусины',
+    'Natural Stone Chrysanthemum & Conch': 'Хризантема и ракушка',
+    'Carnelian Crystal Chips': 'Сердолик',
+    "Tiger's Eye Small Tumbled Chips": 'Тигровый глаз',
+    'Natural Garnet Crystal Fragments': 'Гранат (осколки)',
+    'High-Quality 3Pcs Natural Garnet Small Oval Naked Stone': 'Гранат (овал)',
+    'Ceramic Snail Beads': 'Керамические бусины-улитки',
+    'High-Flash Labradorite Slabs': 'Лабрадорит',
+    'Black Natural Agate Crystal Slices,': 'Чёрный агат (срезы)',
+    'Natural Stone Yellow Tiger Eye Loose Beads 4': 'Тигровый глаз (жёлтый)',
+    'Natural Natural chrysoprase stone': 'Хризопраз',
+    "Natural Dragon'S Blood Stone": 'Камень Кровь дракона',
+    'Grade A Natural Peridot Round Cabochons,': 'Перидот (кабошон)',
+}
+
+# Группы металлов в порядке вывода: (ключ, название в сокращённом списке)
+METAL_GROUPS = [
+    ("copper", "Медь (средняя)"),
+    ("square_copper", "Квадратная медь (средняя)"),
+    ("brass", "Латунь (средняя)"),
+    ("german_silver", "Нейзильбер (средняя)"),
+]
+
+SHORT_COLUMNS = ['Название', 'Цена', 'Ед.изм.']
+RELEVANT_COLUMNS = ["Name", "tags ", "1 piece", "1 gram"]
+
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def classify_rows(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Классифицирует все строки за один проход: колонка Name приводится
+    к нижнему регистру один раз, из неё строятся маски всех групп.
+    """
+    names = df["Name"].astype(str)
+    lower = names.str.lower()
+    has_square = lower.str.contains("square", regex=False).to_numpy()
+    masks = {
+        "copper": lower.str.contains("медь", regex=False).to_numpy() & ~has_square,
+        "square_copper": has_square & lower.str.contains("copper", regex=False).to_numpy(),
+        "brass": lower.str.contains("латун", regex=False).to_numpy(),
+        "german_silver": lower.str.contains("нейз", regex=False).to_numpy(),
+        "stone": (df["tags "] == "stone").to_numpy(),
+        "cyrillic": names.str.contains(r'[А-Яа-яЁё]', na=False).to_numpy(),
+    }
+    return masks
+
+
+def group_price_sums(df: pd.DataFrame, masks: Dict[str, np.ndarray]) -> Dict[str, tuple]:
+    """Сумма и количество цен за грамм для каждой группы металлов (для среднего и слияния частей)."""
+    gram = pd.to_numeric(df["1 gram"], errors="coerce").to_numpy(dtype=np.float64)
+    valid = ~np.isnan(gram)
+    stacked = np.stack([masks[key] & valid for key, _ in METAL_GROUPS]) if len(gram) else \
+        np.zeros((len(METAL_GROUPS), 0), dtype=bool)
+    sums = np.where(stacked, gram, 0.0).sum(axis=1)
+    counts = stacked.sum(axis=1)
+    return {key: (float(sums[i]), int(counts[i])) for i, (key, _) in enumerate(METAL_GROUPS)}
+
+
+def stone_prices(df: pd.DataFrame, mask: np.ndarray) -> pd.DataFrame:
+    """
+    Цены камней: сначала за штуку, затем за грамм. Строки без цены отбрасываются.
+    Возвращает DataFrame с колонками Name, price, unit.
+    """
+    stones = df[mask]
+    piece = pd.to_numeric(stones["1 piece"], errors="coerce").to_numpy(dtype=np.float64)
+    gram = pd.to_numeric(stones["1 gram"], errors="coerce").to_numpy(dtype=np.float64)
+    use_piece = piece > 0
+    price = np.where(use_piece, piece, np.where(gram > 0, gram, np.nan))
+    out = pd.DataFrame({
+        "Name": stones["Name"].astype(str).str.strip().to_numpy(),
+        "price": price,
+        "unit": np.where(use_piece, "шт", "г"),
+    })
+    return out[~np.isnan(price)]
+
+
+def _is_cyrillic(name: str) -> bool:
+    return any('а' <= c.lower() <= 'я' for c in name)
+
+
+def translate_stone(name: str) -> str:
+    """Если название на русском — оставляем, если на английском — переводим вручную."""
+    return name if _is_cyrillic(name) else STONE_TRANSLATE.get(name, name)
+
+
+def _mean(sum_count: tuple) -> float:
+    total, count = sum_count
+    return total / count if count else float("nan")
+
+
+def aggregate_short_rows(df: pd.DataFrame) -> List[dict]:
+    """
+    Строки сокращённого списка (как в short_materials.csv):
+    средние цены металлов и все камни с переводом названий.
+    """
+    masks = classify_rows(df)
+    sums = group_price_sums(df, masks)
+    rows = [
+        {'Название': title, 'Цена': round(_mean(sums[key]), 2), 'Ед.изм.': 'г'}
+        for key, title in METAL_GROUPS
+    ]
+    stones = stone_prices(df, masks["stone"])
+    for name, price, unit in zip(stones["Name"], stones["price"].tolist(), stones["unit"]):
+        rows.append({'Название': translate_stone(name), 'Цена': round(price, 2), 'Ед.изм.': unit})
+    return rows
+
+
+def aggregate_filtered_rows(df: pd.DataFrame) -> List[dict]:
+    """
+    Строки для get_filtered_materials: металлы без цены пропускаются,
+    камни берутся только с русскими названиями и без перевода.
+    """
+    masks = classify_rows(df)
+    sums = group_price_sums(df, masks)
+    rows = []
+    for key, title in METAL_GROUPS:
+        avg = _mean(sums[key])
+        if not np.isnan(avg):
+            rows.append({'Название': title, 'Цена': round(avg, 2), 'Ед.изм.': 'г'})
+    stones = stone_prices(df, masks["stone"] & masks["cyrillic"])
+    for name, price, unit in zip(stones["Name"], stones["price"].tolist(), stones["unit"]):
+        rows.append({'Название': name, 'Цена': round(price, 2), 'Ед.изм.': unit})
+    return rows
+
+
+def relevant_rows_digest(df: pd.DataFrame) -> str:
+    """
+    Хэш строк info.csv, влияющих на сокращённый список (металлы и камни).
+    Считается по хэшам отдельных строк, поэтому правки инструментов и ссылок его не меняют.
+    """
+    masks = classify_rows(df)
+    return hashlib.sha256(_relevant_row_hashes(df, masks)).hexdigest()
+
+
+def _relevant_row_hashes(df: pd.DataFrame, masks: Dict[str, np.ndarray]) -> bytes:
+    relevant = masks["stone"].copy()
+    for key, _ in METAL_GROUPS:
+        relevant |= masks[key]
+    cols = df.loc[relevant, RELEVANT_COLUMNS]
+    # hash_pandas_object зависит от dtype, а куски файла выводят его независимо
+    # (целые цены в одном куске, float в другом) — приводим колонки к фиксированным типам
+    cols = pd.DataFrame({
+        col: (pd.to_numeric(cols[col], errors="coerce").astype("float64")
+              if col in ("1 piece", "1 gram") else cols[col].astype(str))
+        for col in RELEVANT_COLUMNS
+    })
+    return pd.util.hash_pandas_object(cols, index=False).to_numpy().tobytes()
+
+
+def rowhash_path(dst: str) -> str:
+    """Файл с хэшем строк, по которым собран dst (для --incremental)."""
+    return dst + '.rowhash'
+
+
+# ---------- Потоковая обработка по кускам ----------
+
+def chunk_partial(df: pd.DataFrame) -> Tuple[Dict[str, tuple], List[tuple], bytes]:
+    """
+    Частичный итог для одного куска info.csv: суммы и количества цен металлов,
+    строки камней (переведённое название, цена, единица) и хэши значимых строк.
+    Выполняется и в процессах пула, поэтому возвращает только простые типы.
+    """
+    masks = classify_rows(df)
+    stones = stone_prices(df, masks["stone"])
+    stone_rows = [
+        (translate_stone(name), round(price, 2), unit)
+        for name, price, unit in zip(stones["Name"], stones["price"].tolist(), stones["unit"])
+    ]
+    return group_price_sums(df, masks), stone_rows, _relevant_row_hashes(df, masks)
+
+
+def iter_chunk_partials(src: str, chunksize: int = DEFAULT_CHUNKSIZE,
+                        workers: Optional[int] = None) -> Iterator[tuple]:
+    """
+    Частичные итоги кусков в порядке файла. С workers > 1 куски считаются в пуле процессов;
+    в работе одновременно не больше 2 × workers кусков, так что память не зависит от размера файла.
+    """
+    chunks = pd.read_csv(src, chunksize=chunksize)
+    if not workers or workers <= 1:
+        for df in chunks:
+            yield chunk_partial(df)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        pending = deque()
+        for df in chunks:
+            pending.append(pool.apply_async(chunk_partial, (df,)))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def _price_cell(price: float):
+    return '' if math.isnan(price) else price
+
+
+def build_short_materials_streaming(src: str = 'info.csv', dst: str = 'short_materials.csv',
+                                    incremental: bool = False, chunksize: int = DEFAULT_CHUNKSIZE,
+                                    workers: Optional[int] = None) -> bool:
+    """
+    Потоковый вариант build_short_materials для больших прайсов поставщиков.
+    Суммы металлов сливаются по кускам, камни сразу пишутся во временный файл,
+    хэш значимых строк считается нарастающим итогом. Результат тот же, что у build_short_materials.
+    """
+    digest_path = rowhash_path(dst)
+    stones_path = dst + '.stones.tmp'
+    sums = {key: (0.0, 0) for key, _ in METAL_GROUPS}
+    h = hashlib.sha256()
+    with open(stones_path, 'w', encoding='utf-8', newline='') as stones_file:
+        writer = csv.writer(stones_file, lineterminator='\n')
+        for part_sums, stone_rows, row_hashes in iter_chunk_partials(src, chunksize, workers):
+            for key, (total, n) in part_sums.items():
+                sums[key] = (sums[key][0] + total, sums[key][1] + n)
+            writer.writerows(stone_rows)
+            h.update(row_hashes)
+    digest = h.hexdigest()
+    try:
+        if incremental and os.path.exists(dst) and os.path.exists(digest_path):
+            with open(digest_path, encoding='utf-8') as f:
+                if f.read().strip() == digest:
+                    return False
+        tmp = dst + '.tmp'
+        with open(tmp, 'w', encoding='utf-8-sig', newline='') as out:
+            writer = csv.writer(out, lineterminator='\n')
+            writer.writerow(SHORT_COLUMNS)
+            for key, title in METAL_GROUPS:
+                writer.writerow([title, _price_cell(round(_mean(sums[key]), 2)), 'г'])
+            with open(stones_path, encoding='utf-8', newline='') as stones_file:
+                for block in iter(lambda: stones_file.read(1 << 16), ''):
+                    out.write(block)
+        os.replace(tmp, dst)
+    finally:
+        os.remove(stones_path)
+    with open(digest_path, 'w', encoding='utf-8') as f:
+        f.write(digest)
+    return True
+
+
+def build_short_materials(src: str = 'info.csv', dst: str = 'short_materials.csv',
+                          incremental: bool = False) -> bool:
+    """
+    Пересобирает short_materials.csv из src.
+    В инкрементальном режиме файл переписывается только если изменились
+    значимые строки источника. Возвращает True, если файл был записан.
+    """
+    df = pd.read_csv(src)
+    digest_path = rowhash_path(dst)
+    digest = relevant_rows_digest(df)
+    if incremental and os.path.exists(dst) and os.path.exists(digest_path):
+        with open(digest_path, encoding='utf-8') as f:
+            if f.read().strip() == digest:
+                return False
+    short_df = pd.DataFrame(aggregate_short_rows(df), columns=SHORT_COLUMNS)
+    short_df.to_csv(dst, index=False, encoding='utf-8-sig')
+    with open(digest_path, 'w', encoding='utf-8') as f:
+        f.write(digest)
+    return True
@@ -0,0 +1,148 @@
+import hashlib
+import os
+import pickle
+from typing import Dict, List, Optional, Set
+
+from jewelry_cost_calculator import Material, read_materials_csv
+
+SNAPSHOT_VERSION = 2
+GRAM_SIZE = 3  # длина n-грамм в индексе подстрок
+
+
+def normalize_name(name: str) -> str:
+    """Нормализует название материала: нижний регистр, без крайних пробелов."""
+    return name.lower().strip()
+
+
+def file_sha256(path: str) -> str:
+    """sha256 содержимого файла (читается блоками)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class MaterialCatalog:
+    """
+    Каталог материалов с индексами для быстрого поиска.
+    - exact: нормализованное имя -> индекс первого материала с таким именем
+    - grams: каждая подстрока длиной 1..GRAM_SIZE -> отсортированный список индексов
+    Поиск по подстроке пересекает списки n-грамм запроса и проверяет лишь кандидатов,
+    при этом результат совпадает с find_material_price (первое совпадение по порядку).
+    """
+
+    def __init__(self, materials: List[Material]):
+        self.materials = list(materials)
+        self._names = [m.name.lower() for m in self.materials]
+        self._exact: Dict[str, int] = {}
+        grams: Dict[str, Set[int]] = {}
+        for i, name in enumerate(self._names):
+            self._exact.setdefault(normalize_name(name), i)
+            for size in range(1, GRAM_SIZE + 1):
+                for k in range(len(name) - size + 1):
+                    grams.setdefault(name[k:k + size], set()).add(i)
+        self._grams: Dict[str, List[int]] = {g: sorted(ids) for g, ids in grams.items()}
+
+    def __len__(self) -> int:
+        return len(self.materials)
+
+    def __iter__(self):
+        return iter(self.materials)
+
+    def get(self, name: str) -> Optional[Material]:
+        """Точный поиск по нормализованному имени."""
+        i = self._exact.get(normalize_name(name))
+        return None if i is None else self.materials[i]
+
+    def find(self, name: str) -> Optional[Material]:
+        """
+        Поиск по подстроке без учёта регистра — то же поведение, что у find_material_price.
+        """
+        query = name.lower().strip()
+        if not query:
+            return self.materials[0] if self.materials else None
+        if len(query) <= GRAM_SIZE:
+            ids = self._grams.get(query)
+            return self.materials[ids[0]] if ids else None
+        postings = []
+        for k in range(len(query) - GRAM_SIZE + 1):
+            ids = self._grams.get(query[k:k + GRAM_SIZE])
+            if not ids:
+                return None
+            postings.append(ids)
+        postings.sort(key=len)
+        others = [set(p) for p in postings[1:]]
+        for i in postings[0]:
+            if all(i in s for s in others) and query in self._names[i]:
+                return self.materials[i]
+        return None
+
+    @classmethod
+    def from_csv(cls, csv_path: str = "info.csv", snapshot_path: Optional[str] = None) -> "MaterialCatalog":
+        """
+        Строит каталог из CSV, используя бинарный снимок, если он актуален.
+        Снимок инвалидируется по mtime/размеру файла, а при их изменении — по sha256 содержимого.
+        """
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError(f"Файл {csv_path} не найден.")
+        if snapshot_path is None:
+            snapshot_path = csv_path + ".catalog.pickle"
+        st = os.stat(csv_path)
+        snapshot = _read_snapshot(snapshot_path)
+        if snapshot is not None:
+            if (snapshot["mtime_ns"], snapshot["size"]) == (st.st_mtime_ns, st.st_size):
+                return snapshot["catalog"]
+            digest = file_sha256(csv_path)
+            if snapshot["sha256"] == digest:
+                _write_snapshot(snapshot_path, snapshot["catalog"], st, digest)
+                return snapshot["catalog"]
+        else:
+            digest = file_sha256(csv_path)
+        catalog = cls(read_materials_csv(csv_path))
+        _write_snapshot(snapshot_path, catalog, st, digest)
+        return catalog
+
+
+def _read_snapshot(path: str) -> Optional[dict]:
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    return snapshot
+
+
+def _write_snapshot(path: str, catalog: MaterialCatalog, st: os.stat_result, digest: str) -> None:
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": digest,
+        "catalog": catalog,
+    }
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # снимок — лишь ускорение, без него каталог всё равно работает
+
+
+_catalogs: Dict[str, tuple] = {}
+
+
+def get_catalog(csv_path: str = "info.csv") -> MaterialCatalog:
+    """Возвращает каталог, построенный один раз за процесс (с учётом изменений файла)."""
+    key = os.path.abspath(csv_path)
+    st = os.stat(csv_path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _catalogs.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    catalog = MaterialCatalog.from_csv(csv_path)
+    _catalogs[key] = (stamp, catalog)
+    return catalog
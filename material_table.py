@@ -0,0 +1,157 @@
+import sys
+from array import array
+from enum import IntEnum
+from typing import Dict, Iterable, Iterator, List
+
+from jewelry_cost_calculator import Material, iter_materials_csv
+
+
+class Unit(IntEnum):
+    """Коды единиц измерения для компактного хранения."""
+    GRAM = 0
+    PIECE = 1
+
+    @property
+    def label(self) -> str:
+        return UNIT_LABELS[self]
+
+    @classmethod
+    def from_label(cls, label: str) -> "Unit":
+        try:
+            return _UNIT_BY_LABEL[label]
+        except KeyError:
+            raise ValueError(f"Неизвестная единица измерения: {label!r}") from None
+
+
+UNIT_LABELS = {Unit.GRAM: "г", Unit.PIECE: "шт"}
+_UNIT_BY_LABEL = {label: unit for unit, label in UNIT_LABELS.items()}
+
+
+class MaterialRow:
+    """
+    Лёгкое представление строки MaterialTable. Ведёт себя как Material
+    (name, unit_price, quantity, unit, cost()), но данные хранит таблица.
+    """
+    __slots__ = ("_table", "_i")
+
+    def __init__(self, table: "MaterialTable", i: int):
+        self._table = table
+        self._i = i
+
+    @property
+    def name(self) -> str:
+        return self._table._names[self._table.name_codes[self._i]]
+
+    @property
+    def unit_price(self) -> float:
+        return self._table.unit_prices[self._i]
+
+    @unit_price.setter
+    def unit_price(self, value: float) -> None:
+        self._table.unit_prices[self._i] = value
+
+    @property
+    def quantity(self) -> float:
+        return self._table.quantities[self._i]
+
+    @quantity.setter
+    def quantity(self, value: float) -> None:
+        self._table.quantities[self._i] = value
+
+    @property
+    def unit(self) -> str:
+        return UNIT_LABELS[self._table.units[self._i]]
+
+    def cost(self) -> float:
+        return self._table.unit_prices[self._i] * self._table.quantities[self._i]
+
+    def to_material(self) -> Material:
+        return Material(name=self.name, unit_price=self.unit_price, quantity=self.quantity, unit=self.unit)
+
+    def __repr__(self) -> str:
+        return (f"MaterialRow(name={self.name!r}, unit_price={self.unit_price!r}, "
+                f"quantity={self.quantity!r}, unit={self.unit!r})")
+
+
+class MaterialTable:
+    """
+    Каталог материалов в виде набора колонок (struct-of-arrays):
+    - имена хранятся один раз (интернированы), строки ссылаются на них кодом;
+    - цены и количества — array('d'), единицы измерения — array('B') с кодами Unit.
+    Занимает в разы меньше памяти, чем список Material, на больших каталогах.
+    """
+
+    def __init__(self):
+        self._names: List[str] = []
+        self._name_codes: Dict[str, int] = {}
+        self.name_codes = array("I")
+        self.unit_prices = array("d")
+        self.quantities = array("d")
+        self.units = array("B")
+
+    def __len__(self) -> int:
+        return len(self.unit_prices)
+
+    def __getitem__(self, i: int) -> MaterialRow:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("индекс строки вне таблицы")
+        return MaterialRow(self, i)
+
+    def __iter__(self) -> Iterator[MaterialRow]:
+        for i in range(len(self)):
+            yield MaterialRow(self, i)
+
+    def append(self, name: str, unit_price: float, quantity: float = 0, unit: str = "г") -> None:
+        code = self._name_codes.get(name)
+        if code is None:
+            code = len(self._names)
+            self._names.append(sys.intern(name))
+            self._name_codes[self._names[-1]] = code
+        self.units.append(Unit.from_label(unit))
+        self.name_codes.append(code)
+        self.unit_prices.append(unit_price)
+        self.quantities.append(quantity)
+
+    @classmethod
+    def from_materials(cls, materials: Iterable[Material]) -> "MaterialTable":
+        table = cls()
+        for m in materials:
+            table.append(m.name, m.unit_price, m.quantity, m.unit)
+        return table
+
+    @classmethod
+    def from_csv(cls, csv_path: str = "info.csv") -> "MaterialTable":
+        """Строит таблицу прямо из CSV, не создавая промежуточных объектов Material."""
+        table = cls()
+        for name, price, unit in iter_materials_csv(csv_path):
+            table.append(name, price, 0, unit)
+        return table
+
+    def to_materials(self) -> List[Material]:
+        return [row.to_material() for row in self]
+
+    def costs(self) -> array:
+        """Стоимость каждой строки (цена × количество)."""
+        return array("d", map(float.__mul__, self.unit_prices, self.quantities))
+
+    def total_cost(self) -> float:
+        total = 0.0
+        for price, qty in zip(self.unit_prices, self.quantities):
+            total += price * qty
+        return total
+
+    def as_numpy(self) -> dict:
+        """Колонки как массивы NumPy без копирования (представления над буферами array)."""
+        import numpy as np
+        return {
+            "name_codes": np.frombuffer(self.name_codes, dtype=np.uintc),
+            "unit_prices": np.frombuffer(self.unit_prices, dtype=np.float64),
+            "quantities": np.frombuffer(self.quantities, dtype=np.float64),
+            "units": np.frombuffer(self.units, dtype=np.uint8),
+        }
+
+    def nbytes(self) -> int:
+        """Размер колонок в байтах (без учёта самих строк-имён)."""
+        return sum(a.itemsize * len(a) for a in (self.name_codes, self.unit_prices, self.quantities, self.units))
@@ -0,0 +1,104 @@
+import json
+import os
+from typing import Optional, Sequence
+
+from currency import format_amount
+from jewelry_cost_calculator import JewelryCostInput, JewelryCostResult, cost_input_from_dict, cost_input_to_dict
+
+COST_SECTION_HEADER = "## Себестоимость и затраты\n\n"
+DESCRIPTION_HEADER = "---\n\n## Описание для Instagram\n\n"
+SIDECAR_VERSION = 1
+
+
+def get_start_price(result: JewelryCostResult) -> int:
+    """Начальная цена (×1.5), если её нет среди рекомендованных."""
+    for label, price in result.recommended_prices.items():
+        if '1.5' in label or 'начал' in label.lower():
+            return int(price)
+    return int(result.total_cost * 1.5)
+
+
+def render_cost_section(result: JewelryCostResult) -> str:
+    """Разделы «Себестоимость и затраты» и «Рекомендуемая цена продажи»."""
+    parts = [COST_SECTION_HEADER]
+    for name, cost in result.cost_breakdown.items():
+        parts.append(f"- {name}: {int(cost)} тг\n")
+    parts.append(f"\n**Итого себестоимость:** {int(result.total_cost)} тг\n\n")
+    parts.append("## Рекомендуемая цена продажи\n\n")
+    for label, price in result.recommended_prices.items():
+        converted = result.converted_prices.get(label)
+        if converted:
+            alt = ', '.join(format_amount(value, code) for code, value in converted.items())
+            parts.append(f"- {label}: {int(price)} тг ({alt})\n")
+        else:
+            parts.append(f"- {label}: {int(price)} тг\n")
+    parts.append(f"\n{result.price_comment}\n\n")
+    return ''.join(parts)
+
+
+def render_piece_markdown(jewelry_type, today, result, desc, photo_path) -> str:
+    """Собирает содержимое .md-файла изделия."""
+    parts = [
+        f"# {jewelry_type}\n\n",
+        f"**Дата создания:** {today}\n\n",
+        render_cost_section(result),
+        DESCRIPTION_HEADER,
+        desc + '\n',
+    ]
+    if photo_path:
+        parts.append(f"\n![]({photo_path})\n")
+    return ''.join(parts)
+
+
+def sidecar_path(md_path: str) -> str:
+    """Путь к JSON-записи изделия рядом с его .md-файлом."""
+    return os.path.splitext(md_path)[0] + '.json'
+
+
+def piece_record(jewelry_type: str, today: str, cost_input: JewelryCostInput,
+                 currencies: Sequence[str] = ()) -> dict:
+    """Структурированная запись изделия: всё, что нужно для пересчёта цены."""
+    return {
+        "version": SIDECAR_VERSION,
+        "type": jewelry_type,
+        "date": today,
+        "cost_input": cost_input_to_dict(cost_input),
+        "currencies": list(currencies),
+    }
+
+
+def read_sidecar(md_path: str) -> Optional[dict]:
+    try:
+        with open(sidecar_path(md_path), encoding='utf-8') as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if record.get("version") != SIDECAR_VERSION:
+        return None
+    return record
+
+
+def record_cost_input(record: dict) -> JewelryCostInput:
+    return cost_input_from_dict(record["cost_input"])
+
+
+def replace_file(path: str, content: str) -> None:
+    """
+    Атомарно заменяет файл: пишет во временный .<имя>.tmp рядом и переименовывает.
+    При сбое посреди записи прежний файл остаётся целым.
+    """
+    tmp = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_sidecar(md_path: str, record: dict) -> None:
+    replace_file(sidecar_path(md_path), json.dumps(record, ensure_ascii=False, indent=1))
@@ -0,0 +1,217 @@
+import argparse
+import glob
+import os
+import re
+import sqlite3
+from typing import Iterable, Iterator, List, Optional
+
+DEFAULT_DB = '.pieces.sqlite'
+
+# Файлы изделий в корне проекта: <тип>_YYYY-MM-DD_HH-MM[ copy|_N].md
+TOP_LEVEL_RE = re.compile(r'_\d{4}-\d{2}-\d{2}_\d{2}-\d{2}[^/]*\.md$')
+DATE_IN_NAME_RE = re.compile(r'(\d{4}-\d{2}-\d{2}_\d{2}-\d{2})')
+ITEM_RE = re.compile(r'^- (.+?): (-?\d+) тг')
+QTY_RE = re.compile(r'^(.+) \(([\d.]+) ([^)\s]+)\)$')
+PRICE_RE = re.compile(r'^- (.+?) \(×([\d.]+)\): (-?\d+) тг')
+TOTAL_RE = re.compile(r'^\*\*Итого себестоимость:\*\* (-?\d+) тг')
+
+PRICE_COLUMNS = {'1.5': 'start_price', '2': 'min_price', '2.5': 'comfort_price', '3': 'premium_price'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pieces (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    type TEXT,
+    type_norm TEXT,
+    date TEXT,
+    total_cost REAL,
+    start_price REAL,
+    min_price REAL,
+    comfort_price REAL,
+    premium_price REAL,
+    labour_hours REAL,
+    labour_cost REAL
+);
+CREATE TABLE IF NOT EXISTS materials (
+    piece_id INTEGER NOT NULL REFERENCES pieces(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    quantity REAL,
+    unit TEXT,
+    cost REAL
+);
+CREATE INDEX IF NOT EXISTS pieces_type ON pieces(type_norm, total_cost);
+CREATE INDEX IF NOT EXISTS pieces_date ON pieces(date);
+CREATE INDEX IF NOT EXISTS materials_piece ON materials(piece_id);
+CREATE INDEX IF NOT EXISTS materials_name ON materials(name);
+"""
+
+
+def parse_piece(lines: Iterable[str], path: str = '') -> dict:
+    """
+    Потоковый разбор .md-файла в формате example_usage.py.
+    Читает строки до раздела «Описание для Instagram» — остальное не нужно.
+    """
+    piece = {
+        'type': None, 'date': None, 'total_cost': None, 'labour_hours': None, 'labour_cost': None,
+        'start_price': None, 'min_price': None, 'comfort_price': None, 'premium_price': None,
+        'materials': [],
+    }
+    section = None
+    for line in lines:
+        line = line.rstrip('\n')
+        if line.startswith('## '):
+            if 'Описание' in line:
+                break
+            section = 'prices' if 'цена' in line.lower() else 'costs'
+            continue
+        if line.startswith('# ') and piece['type'] is None:
+            piece['type'] = line[2:].strip()
+        elif line.startswith('**Дата создания:**'):
+            piece['date'] = line.split('**', 2)[2].strip()
+        elif section == 'costs':
+            m = TOTAL_RE.match(line)
+            if m:
+                piece['total_cost'] = float(m.group(1))
+                continue
+            m = ITEM_RE.match(line)
+            if not m:
+                continue
+            name, cost = m.group(1), float(m.group(2))
+            q = QTY_RE.match(name)
+            if q is None:
+                continue  # расходники без количества
+            if q.group(3) == 'ч' and q.group(1) == 'Время':
+                piece['labour_hours'] = float(q.group(2))
+                piece['labour_cost'] = cost
+            else:
+                piece['materials'].append((q.group(1), float(q.group(2)), q.group(3), cost))
+        elif section == 'prices':
+            m = PRICE_RE.match(line)
+            if m and m.group(2) in PRICE_COLUMNS:
+                piece[PRICE_COLUMNS[m.group(2)]] = float(m.group(3))
+    if piece['date'] is None:
+        m = DATE_IN_NAME_RE.search(os.path.basename(path))
+        piece['date'] = m.group(1) if m else None
+    return piece
+
+
+def find_piece_files(root: str = '.') -> Iterator[str]:
+    """Файлы изделий: всё в jewelry/ и датированные .md в корне проекта."""
+    yield from glob.glob(os.path.join(root, 'jewelry', '*.md'))
+    for path in glob.glob(os.path.join(root, '*.md')):
+        if TOP_LEVEL_RE.search(os.path.basename(path)):
+            yield path
+
+
+class PieceIndex:
+    """Встроенный SQLite-индекс по сгенерированным .md-файлам изделий."""
+
+    def __init__(self, db_path: str = DEFAULT_DB):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def update(self, root: str = '.') -> dict:
+        """
+        Инкрементально обновляет индекс: разбираются только новые файлы и файлы
+        с изменившимся mtime, записи об удалённых файлах удаляются.
+        """
+        known = dict(self.conn.execute('SELECT path, mtime_ns FROM pieces'))
+        seen = set()
+        added = 0
+        with self.conn:
+            for path in find_piece_files(root):
+                rel = os.path.relpath(path, root)
+                seen.add(rel)
+                mtime = os.stat(path).st_mtime_ns
+                if known.get(rel) == mtime:
+                    continue
+                with open(path, encoding='utf-8') as f:
+                    piece = parse_piece(f, path)
+                self._upsert(rel, mtime, piece)
+                added += 1
+            removed = [p for p in known if p not in seen]
+            self.conn.executemany('DELETE FROM pieces WHERE path = ?', [(p,) for p in removed])
+        return {'updated': added, 'removed': len(removed), 'total': len(seen)}
+
+    def _upsert(self, rel: str, mtime: int, piece: dict) -> None:
+        self.conn.execute('DELETE FROM pieces WHERE path = ?', (rel,))
+        cur = self.conn.execute(
+            'INSERT INTO pieces (path, mtime_ns, type, type_norm, date, total_cost, start_price, min_price,'
+            ' comfort_price, premium_price, labour_hours, labour_cost) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)',
+            (rel, mtime, piece['type'], (piece['type'] or '').lower(), piece['date'], piece['total_cost'],
+             piece['start_price'], piece['min_price'], piece['comfort_price'], piece['premium_price'],
+             piece['labour_hours'], piece['labour_cost']),
+        )
+        self.conn.executemany(
+            'INSERT INTO materials (piece_id, name, quantity, unit, cost) VALUES (?,?,?,?,?)',
+            [(cur.lastrowid, *m) for m in piece['materials']],
+        )
+
+    def query(self, sql: str, params=()) -> List[tuple]:
+        return self.conn.execute(sql, params).fetchall()
+
+    def pieces_under(self, max_price: float, jewelry_type: Optional[str] = None,
+                     column: str = 'min_price') -> List[tuple]:
+        """Изделия (тип, дата, цена, путь) с ценой в колонке column не выше max_price."""
+        if column not in PRICE_COLUMNS.values() and column != 'total_cost':
+            raise ValueError(f"Неизвестная колонка цены: {column}")
+        sql = f'SELECT type, date, {column}, path FROM pieces WHERE {column} <= ?'
+        params = [max_price]
+        if jewelry_type:
+            sql += ' AND type_norm = ?'
+            params.append(jewelry_type.lower())
+        return self.query(sql + f' ORDER BY {column}', params)
+
+    def stats_by_type(self) -> List[tuple]:
+        """По типам: количество, средняя себестоимость, средние часы работы."""
+        return self.query(
+            'SELECT type_norm, COUNT(*), AVG(total_cost), AVG(labour_hours) '
+            'FROM pieces GROUP BY type_norm ORDER BY COUNT(*) DESC'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Индекс изделий по .md-файлам')
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--root', default='.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('update', help='обновить индекс')
+    sub.add_parser('stats', help='сводка по типам изделий')
+    under = sub.add_parser('under', help='изделия дешевле заданной цены')
+    under.add_argument('price', type=float)
+    under.add_argument('--type')
+    under.add_argument('--column', default='min_price')
+    q = sub.add_parser('query', help='произвольный SQL-запрос')
+    q.add_argument('sql')
+    args = parser.parse_args()
+
+    with PieceIndex(args.db) as index:
+        stats = index.update(args.root)
+        if args.command == 'update':
+            print(f"Обновлено: {stats['updated']}, удалено: {stats['removed']}, всего: {stats['total']}")
+        elif args.command == 'stats':
+            for t, n, cost, hours in index.stats_by_type():
+                hours_str = f"{hours:.1f} ч" if hours is not None else '—'
+                print(f"{t}: {n} шт, себестоимость {cost or 0:.0f} тг, время {hours_str}")
+        elif args.command == 'under':
+            for row in index.pieces_under(args.price, args.type, args.column):
+                print(' | '.join('' if v is None else str(v) for v in row))
+        else:
+            for row in index.query(args.sql):
+                print(' | '.join('' if v is None else str(v) for v in row))
+
+
+if __name__ == '__main__':
+    main()
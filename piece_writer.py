@@ -0,0 +1,189 @@
+import json
+import os
+import queue
+import threading
+from typing import Container, Dict, List, Optional, Set, Tuple
+
+from piece_files import sidecar_path
+from profiling import span
+
+DEFAULT_BATCH = 128          # файлов за один проход записи (и одну серию fsync)
+DEFAULT_MAX_PENDING = 4096   # предел очереди: submit блокируется, если запись отстаёт
+
+
+def unique_path(path: str, reserved: Container[str] = (), existing: Optional[Container[str]] = None) -> str:
+    """
+    Свободное имя для файла изделия: path, а если он (или его JSON-запись) уже есть —
+    path с суффиксом -2, -3, ... перед расширением.
+    existing — заранее прочитанные имена файлов каталога; без него наличие проверяется на диске.
+    """
+    def taken(candidate: str) -> bool:
+        if candidate in reserved:
+            return True
+        side = sidecar_path(candidate)
+        if existing is None:
+            return os.path.exists(candidate) or os.path.exists(side)
+        return os.path.basename(candidate) in existing or os.path.basename(side) in existing
+
+    stem, ext = os.path.splitext(path)
+    candidate, n = path, 1
+    while taken(candidate):
+        n += 1
+        candidate = f"{stem}-{n}{ext}"
+    return candidate
+
+
+def _fsync_dir(path: str) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # на некоторых системах каталог нельзя открыть — довольствуемся fsync файлов
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class PieceWriter:
+    """
+    Фоновая запись файлов изделий (.md и JSON-запись).
+    submit() сразу резервирует уникальное имя и ставит готовое содержимое в очередь;
+    поток записи забирает файлы пачками, пишет каждый во временный файл рядом
+    с целевым и атомарно переименовывает. При fsync=True данные сбрасываются на диск
+    один раз на пачку: сначала fsync всех временных файлов, затем переименования
+    и fsync каждого затронутого каталога.
+    Уникальность имён гарантируется внутри процесса и относительно файлов, которые были
+    в каталоге при первой записи в него (каталог читается один раз, а не проверяется на каждый файл).
+    Поток записи запускается при первом submit(), поэтому писателя можно создать
+    до пула процессов: fork не застанет работающий поток.
+    """
+
+    def __init__(self, fsync: bool = True, batch_size: int = DEFAULT_BATCH,
+                 max_pending: int = DEFAULT_MAX_PENDING):
+        self.fsync = fsync
+        self.batch_size = batch_size
+        self.written = 0
+        self.batches = 0
+        self._queue: queue.Queue = queue.Queue(max_pending)
+        self._reserved = set()
+        self._listings: Dict[str, Set[str]] = {}
+        self._dirs: Set[str] = set()
+        self._lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name='piece-writer', daemon=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def reserve(self, path: str) -> str:
+        directory = os.path.dirname(path) or '.'
+        with self._lock:
+            existing = self._listings.get(directory)
+            if existing is None:
+                try:
+                    existing = self._listings[directory] = set(os.listdir(directory))
+                except OSError:
+                    existing = self._listings[directory] = set()
+            path = unique_path(path, self._reserved, existing)
+            self._reserved.add(path)
+        return path
+
+    def submit(self, path: str, content: str, record: Optional[dict] = None) -> str:
+        """Ставит файл в очередь записи и возвращает имя, под которым он будет сохранён."""
+        self._raise_error()
+        path = self.reserve(path)
+        with self._lock:
+            if not self._thread.is_alive() and self._thread.ident is None:
+                self._thread.start()
+        self._queue.put((path, content, record))
+        return path
+
+    def flush(self) -> None:
+        """Ждёт записи всего, что поставлено в очередь."""
+        self._queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while batch[-1] is not None and len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            items = [item for item in batch if item is not None]
+            try:
+                if items:
+                    self._write_batch(items)
+            except BaseException as e:  # ошибка отдаётся вызывающему в submit/flush/close
+                if self._error is None:
+                    self._error = e
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if batch[-1] is None:
+                return
+
+    def _write_batch(self, items: List[tuple]) -> None:
+        with span("markdown_write"):
+            self._write_files(items)
+        self.written += len(items)
+        self.batches += 1
+
+    def _write_files(self, items: List[tuple]) -> None:
+        staged: List[Tuple[str, str]] = []
+        try:
+            files = []
+            for path, content, record in items:
+                directory = os.path.dirname(path) or '.'
+                if directory not in self._dirs:
+                    os.makedirs(directory, exist_ok=True)
+                    self._dirs.add(directory)
+                files.append((path, content))
+                if record is not None:
+                    files.append((sidecar_path(path), json.dumps(record, ensure_ascii=False, indent=1)))
+            handles = []  # при fsync файлы остаются открытыми до общего сброса пачки
+            try:
+                for path, content in files:
+                    tmp = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+                    f = open(tmp, 'w', encoding='utf-8')
+                    staged.append((tmp, path))
+                    handles.append(f)
+                    f.write(content)
+                    if not self.fsync:
+                        handles.pop().close()
+                    else:
+                        f.flush()
+                for f in handles:
+                    os.fsync(f.fileno())
+            finally:
+                for f in handles:
+                    f.close()
+            for tmp, path in staged:
+                os.replace(tmp, path)
+            staged = []
+        finally:
+            for tmp, _ in staged:  # запись пачки прервалась — не оставляем временных файлов
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+        if self.fsync:
+            for directory in {os.path.dirname(path) or '.' for path, _, _ in items}:
+                _fsync_dir(directory)
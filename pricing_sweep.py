@@ -0,0 +1,184 @@
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from batch_calculator import JewelryCostBatch
+from jewelry_cost_calculator import PRICE_TIERS, RETAIL_FACTOR, JewelryCostInput
+
+# Параметры сетки в порядке осей (изделие — всегда первая ось)
+AXES = ("hourly_rate", "hours", "defect_percent", "consumable_cost", "markup")
+
+DEFAULT_CHUNK = 1_000_000
+
+
+@dataclass
+class SweepResult:
+    """
+    Итоги перебора сценариев.
+    summary — по изделию: число сценариев, мин./средн./макс. себестоимость, цена и маржа;
+    frontier — для каждого ценового интервала сценарий с наибольшей маржой.
+    """
+    scenarios: int
+    summary: List[dict]
+    frontier: List[dict]
+
+
+def _axis(values, default: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    if values is None:
+        return None if default is None else np.asarray(default, dtype=np.float64)
+    return np.atleast_1d(np.asarray(values, dtype=np.float64))
+
+
+def _piece_parts(batch: JewelryCostBatch) -> Dict[str, np.ndarray]:
+    """Постоянные части себестоимости каждого изделия (не зависящие от параметров сетки)."""
+    return {
+        "material": (batch.unit_prices * batch.quantities).sum(axis=1),
+        "fixed": batch.electricity_cost + batch.tool_depreciation + batch.packaging_cost
+        + batch.extra_costs.sum(axis=1),
+        "consumable": batch.consumable_costs.sum(axis=1),
+        "hours": batch.hours,
+        "hourly_rate": batch.hourly_rates,
+        "defect_percent": batch.defect_percent,
+    }
+
+
+class PricingSweep:
+    """
+    Анализ чувствительности цены: декартова сетка по ставке, времени, проценту брака,
+    сумме расходников и наценке для одного или многих изделий.
+    Сетка перебирается кусками по chunk_size сценариев, поэтому память ограничена
+    размером куска, а не числом сценариев.
+    Не заданная ось берёт значение из самого изделия (наценка по умолчанию — из PRICE_TIERS).
+    """
+
+    def __init__(self, pieces: Union[JewelryCostInput, Sequence[JewelryCostInput]],
+                 hourly_rate=None, hours=None, defect_percent=None, consumable_cost=None, markup=None,
+                 chunk_size: int = DEFAULT_CHUNK):
+        if isinstance(pieces, JewelryCostInput):
+            pieces = [pieces]
+        self.parts = _piece_parts(JewelryCostBatch.from_inputs(pieces))
+        self.n_pieces = len(pieces)
+        self.axes = {
+            "hourly_rate": _axis(hourly_rate, None),
+            "hours": _axis(hours, None),
+            "defect_percent": _axis(defect_percent, None),
+            "consumable_cost": _axis(consumable_cost, None),
+            "markup": _axis(markup, [k for _, k in PRICE_TIERS]),
+        }
+        self.shape = (self.n_pieces,) + tuple(1 if a is None else len(a) for a in self.axes.values())
+        self.size = int(np.prod(self.shape))
+        self.chunk_size = chunk_size
+
+    def _values(self, name: str, piece: np.ndarray, idx: np.ndarray) -> np.ndarray:
+        axis = self.axes[name]
+        if axis is None:
+            key = "consumable" if name == "consumable_cost" else name
+            return self.parts[key][piece]
+        return axis[idx]
+
+    def iter_chunks(self) -> Iterator[Dict[str, np.ndarray]]:
+        """Выдаёт сценарии кусками: индексы и массивы параметров, себестоимости, цены и маржи."""
+        for start in range(0, self.size, self.chunk_size):
+            flat = np.arange(start, min(start + self.chunk_size, self.size), dtype=np.int64)
+            piece, *idx = np.unravel_index(flat, self.shape)
+            values = {name: self._values(name, piece, i) for name, i in zip(AXES, idx)}
+            pre = (self.parts["material"][piece] + values["hours"] * values["hourly_rate"]
+                   + values["consumable_cost"] + self.parts["fixed"][piece])
+            total = pre * (1 + values["defect_percent"] / 100)
+            price = total * values["markup"]
+            yield {
+                "scenario": flat,
+                "piece": piece,
+                **values,
+                "total_cost": total,
+                "price": price,
+                "retail_price": price * RETAIL_FACTOR,
+                "margin": price - total,
+            }
+
+    def _price_bounds(self) -> tuple:
+        """Цена монотонно растёт по каждой оси, поэтому границы считаются по крайним значениям."""
+        bounds = []
+        for pick in (np.min, np.max):
+            vals = {}
+            for name in AXES:
+                axis = self.axes[name]
+                key = "consumable" if name == "consumable_cost" else name
+                vals[name] = self.parts[key] if axis is None else pick(axis)
+            pre = self.parts["material"] + vals["hours"] * vals["hourly_rate"] + vals["consumable_cost"] \
+                + self.parts["fixed"]
+            bounds.append(pick(pre * (1 + vals["defect_percent"] / 100) * vals["markup"]))
+        return float(bounds[0]), float(bounds[1])
+
+    def run(self, price_bins: int = 50) -> SweepResult:
+        """Перебирает всю сетку и возвращает сводку по изделиям и границу «цена — маржа»."""
+        n = self.n_pieces
+        count = np.zeros(n, dtype=np.int64)
+        sums = {k: np.zeros(n) for k in ("total_cost", "price", "margin")}
+        mins = {k: np.full(n, np.inf) for k in sums}
+        maxs = {k: np.full(n, -np.inf) for k in sums}
+        lo, hi = self._price_bounds()
+        edges = np.linspace(lo, hi, price_bins + 1) if hi > lo else np.array([lo, lo + 1.0])
+        n_bins = len(edges) - 1
+        best_margin = np.full(n_bins, -np.inf)
+        best_scenario = np.full(n_bins, -1, dtype=np.int64)
+
+        for chunk in self.iter_chunks():
+            # номера изделий в куске не убывают — агрегируем по границам отрезков
+            piece = chunk["piece"]
+            starts = np.flatnonzero(np.r_[True, piece[1:] != piece[:-1]])
+            ids = piece[starts]
+            count[ids] += np.diff(np.r_[starts, len(piece)])
+            for k in sums:
+                sums[k][ids] += np.add.reduceat(chunk[k], starts)
+                mins[k][ids] = np.minimum(mins[k][ids], np.minimum.reduceat(chunk[k], starts))
+                maxs[k][ids] = np.maximum(maxs[k][ids], np.maximum.reduceat(chunk[k], starts))
+            bins = np.clip(np.searchsorted(edges, chunk["price"], side="right") - 1, 0, n_bins - 1)
+            order = np.lexsort((-chunk["margin"], bins))
+            first = order[np.r_[True, bins[order][1:] != bins[order][:-1]]]
+            better = chunk["margin"][first] > best_margin[bins[first]]
+            best_margin[bins[first][better]] = chunk["margin"][first][better]
+            best_scenario[bins[first][better]] = chunk["scenario"][first][better]
+
+        summary = []
+        for i in range(n):
+            row = {"piece": i, "scenarios": int(count[i])}
+            for k in sums:
+                row[f"{k}_min"] = float(mins[k][i])
+                row[f"{k}_mean"] = float(sums[k][i] / count[i]) if count[i] else float("nan")
+                row[f"{k}_max"] = float(maxs[k][i])
+            summary.append(row)
+        return SweepResult(scenarios=self.size, summary=summary,
+                           frontier=self._frontier(edges, best_scenario))
+
+    def scenario(self, flat_index: int) -> dict:
+        """Параметры одного сценария по его номеру в сетке."""
+        piece, *idx = np.unravel_index(np.array([flat_index]), self.shape)
+        values = {name: float(self._values(name, piece, i)[0]) for name, i in zip(AXES, idx)}
+        return {"piece": int(piece[0]), **values}
+
+    def _frontier(self, edges: np.ndarray, best_scenario: np.ndarray) -> List[dict]:
+        frontier = []
+        for b, flat in enumerate(best_scenario):
+            if flat < 0:
+                continue
+            params = self.scenario(int(flat))
+            pre = (self.parts["material"][params["piece"]] + params["hours"] * params["hourly_rate"]
+                   + params["consumable_cost"] + self.parts["fixed"][params["piece"]])
+            total = pre * (1 + params["defect_percent"] / 100)
+            price = total * params["markup"]
+            frontier.append({
+                "price_from": float(edges[b]), "price_to": float(edges[b + 1]),
+                **params, "total_cost": float(total), "price": float(price),
+                "margin": float(price - total),
+                "margin_percent": float((price - total) / price * 100) if price else 0.0,
+            })
+        return frontier
+
+
+def sweep(pieces, hourly_rate=None, hours=None, defect_percent=None, consumable_cost=None, markup=None,
+          chunk_size: int = DEFAULT_CHUNK, price_bins: int = 50) -> SweepResult:
+    """Короткая запись: PricingSweep(...).run(price_bins)."""
+    return PricingSweep(pieces, hourly_rate, hours, defect_percent, consumable_cost, markup,
+                        chunk_size).run(price_bins)
@@ -0,0 +1,147 @@
+import json
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Optional
+
+# Инструментирование выключено по умолчанию: span() отдаёт общий пустой
+# контекст-менеджер, а count() сводится к одной проверке флага.
+_enabled = False
+_spans: Dict[str, list] = {}     # имя -> [число вызовов, суммарное время, макс. время]
+_counters: Dict[str, int] = {}
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def _record(name: str, seconds: float) -> None:
+    stat = _spans.get(name)
+    if stat is None:
+        _spans[name] = [1, seconds, seconds]
+    else:
+        stat[0] += 1
+        stat[1] += seconds
+        if seconds > stat[2]:
+            stat[2] = seconds
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    _spans.clear()
+    _counters.clear()
+
+
+def span(name: str):
+    """Контекст-менеджер замера этапа: with span("csv_parse"): ..."""
+    return _Span(name) if _enabled else _NULL_SPAN
+
+
+def timed(name: Optional[str] = None):
+    """Декоратор замера функции; без имени используется имя функции."""
+    def decorator(fn):
+        label = name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record(label, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def count(name: str, n: int = 1) -> None:
+    """Увеличивает счётчик (строки CSV, поиски материалов и т.п.)."""
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def report() -> dict:
+    """Текущие замеры в виде словаря, пригодного для JSON."""
+    return {
+        "spans": {
+            name: {"calls": calls, "total_ms": total * 1000, "max_ms": worst * 1000}
+            for name, (calls, total, worst) in _spans.items()
+        },
+        "counters": dict(_counters),
+    }
+
+
+def merge(other: dict) -> None:
+    """Добавляет к текущим замерам отчёт из другого процесса (результат report())."""
+    for name, s in other.get("spans", {}).items():
+        stat = _spans.setdefault(name, [0, 0.0, 0.0])
+        stat[0] += s["calls"]
+        stat[1] += s["total_ms"] / 1000
+        stat[2] = max(stat[2], s["max_ms"] / 1000)
+    for name, n in other.get("counters", {}).items():
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def write_report(path: str, **extra) -> None:
+    """Сохраняет JSON-отчёт о замерах; '-' — вывод в stdout."""
+    data = {**extra, **report()}
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    if path == "-":
+        print(text)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+@contextmanager
+def cprofile(dump_path: Optional[str]):
+    """Запускает cProfile на время блока и сохраняет статистику в dump_path (если задан)."""
+    if not dump_path:
+        yield None
+        return
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(dump_path)
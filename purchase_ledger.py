@@ -0,0 +1,295 @@
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+
+from jewelry_cost_calculator import csv_float
+from material_aggregation import METAL_GROUPS, SHORT_COLUMNS, rowhash_path, translate_stone
+
+LEDGER_VERSION = 2
+HASH_BLOCK = 1 << 20
+
+# Колонки info.csv, нужные журналу
+NAME, TOTAL, PIECE, GRAM, TAG, GRAMS, COUNT, DATE = (
+    "Name", "Цена тенге", "1 piece", "1 gram", "tags ", "gramm", "Колличество", "Date"
+)
+DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y", "%Y-%m-%d_%H-%M", "%Y-%m-%d %H:%M")
+
+
+def ledger_path(csv_path: str) -> str:
+    """Файл состояния журнала рядом с info.csv."""
+    return csv_path + '.ledger.json'
+
+
+def _number(value: Optional[str]) -> Optional[float]:
+    try:
+        return csv_float(value)
+    except ValueError:
+        return None
+
+
+def parse_day(value: Optional[str]) -> Optional[float]:
+    """Дата покупки в днях (ordinal); пустые и нераспознанные даты — None."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return float(datetime.strptime(value, fmt).toordinal())
+        except ValueError:
+            continue
+    return None
+
+
+def metal_groups(name: str) -> List[str]:
+    """Группы металлов строки — те же правила, что в material_aggregation.classify_rows."""
+    lower = name.lower()
+    has_square = "square" in lower
+    groups = []
+    if "медь" in lower and not has_square:
+        groups.append("copper")
+    if has_square and "copper" in lower:
+        groups.append("square_copper")
+    if "латун" in lower:
+        groups.append("brass")
+    if "нейз" in lower:
+        groups.append("german_silver")
+    return groups
+
+
+@dataclass(slots=True)
+class LedgerEntry:
+    """
+    Накопленная средняя цена одного материала.
+    value_sum и weight_sum — суммы «цена × количество» и «количество»,
+    приведённые к дате ref_day (при затухании старые покупки весят меньше).
+    """
+    name: str
+    unit: str
+    value_sum: float = 0.0
+    weight_sum: float = 0.0
+    ref_day: Optional[float] = None
+    rows: int = 0
+
+    def add(self, price: float, weight: float, day: Optional[float], half_life: Optional[float]) -> None:
+        """Учитывает одну покупку за O(1)."""
+        if half_life and day is not None:
+            if self.ref_day is None:
+                self.ref_day = day
+            elif day > self.ref_day:
+                factor = 0.5 ** ((day - self.ref_day) / half_life)
+                self.value_sum *= factor
+                self.weight_sum *= factor
+                self.ref_day = day
+            else:
+                weight *= 0.5 ** ((self.ref_day - day) / half_life)
+        self.value_sum += price * weight
+        self.weight_sum += weight
+        self.rows += 1
+
+    @property
+    def price(self) -> Optional[float]:
+        return self.value_sum / self.weight_sum if self.weight_sum else None
+
+
+class PurchaseLedger:
+    """
+    Журнал закупок: средние цены за единицу, взвешенные по купленному количеству
+    (граммы для цены за грамм, штуки для цены за штуку) и, если задан half_life_days,
+    экспоненциально затухающие с возрастом покупки.
+    Металлы усредняются по группам METAL_GROUPS, камни — по переведённому названию и единице.
+    """
+
+    def __init__(self, half_life_days: Optional[float] = None):
+        self.half_life_days = half_life_days
+        self.entries: Dict[str, LedgerEntry] = {
+            key: LedgerEntry(title, "г") for key, title in METAL_GROUPS
+        }
+        self.offset = 0      # сколько байт info.csv уже учтено
+        self.prefix = ""     # sha256 учтённых байт [0, offset)
+        self.stamp = None    # (mtime_ns, size) файла на момент последнего чтения
+
+    def add_row(self, row: dict) -> None:
+        """Учитывает одну строку info.csv."""
+        name = row.get(NAME) or "nan"  # pandas читает пустое имя как NaN
+        day = parse_day(row.get(DATE))
+        gram = _number(row.get(GRAM))
+        grams = _number(row.get(GRAMS))
+        gram_weight = grams if grams and grams > 0 else 1.0
+        if gram is not None:
+            for key in metal_groups(name):
+                self.entries[key].add(gram, gram_weight, day, self.half_life_days)
+        if row.get(TAG) != "stone":
+            return
+        piece = _number(row.get(PIECE))
+        if piece is not None and piece > 0:
+            count = _number(row.get(COUNT))
+            price, unit, weight = piece, "шт", count if count and count > 0 else 1.0
+        elif gram is not None and gram > 0:
+            price, unit, weight = gram, "г", gram_weight
+        else:
+            return
+        name = translate_stone(name.strip())
+        key = f"stone\t{name}\t{unit}"
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = LedgerEntry(name, unit)
+        entry.add(price, weight, day, self.half_life_days)
+
+    def short_rows(self) -> List[dict]:
+        """Строки в формате short_materials.csv: металлы, затем камни в порядке первой покупки."""
+        return [
+            {'Название': entry.name, 'Цена': round(entry.price, 2), 'Ед.изм.': entry.unit}
+            for entry in self.entries.values() if entry.price is not None
+        ]
+
+    def write_short_materials(self, dst: str = 'short_materials.csv') -> None:
+        """
+        Пишет средневзвешенные цены в dst. Хэш строк от прошлой сборки средних (--incremental)
+        удаляется: он описывает уже не этот файл, и следующая сборка средних перепишет dst.
+        """
+        try:
+            os.remove(rowhash_path(dst))
+        except FileNotFoundError:
+            pass
+        with open(dst, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=SHORT_COLUMNS, lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(self.short_rows())
+
+    def to_dict(self) -> dict:
+        return {
+            "version": LEDGER_VERSION,
+            "half_life_days": self.half_life_days,
+            "offset": self.offset,
+            "prefix": self.prefix,
+            "stamp": self.stamp,
+            "entries": {
+                key: [e.name, e.unit, e.value_sum, e.weight_sum, e.ref_day, e.rows]
+                for key, e in self.entries.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PurchaseLedger":
+        ledger = cls(data["half_life_days"])
+        ledger.offset = data["offset"]
+        ledger.prefix = data["prefix"]
+        ledger.stamp = tuple(data["stamp"]) if data["stamp"] else None
+        ledger.entries = {key: LedgerEntry(*values) for key, values in data["entries"].items()}
+        return ledger
+
+    def save(self, path: str) -> None:
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, half_life_days: Optional[float] = None) -> Optional["PurchaseLedger"]:
+        """Загружает состояние; None, если его нет, оно повреждено или посчитано с другим затуханием."""
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != LEDGER_VERSION or data.get("half_life_days") != half_life_days:
+                return None
+            return cls.from_dict(data)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+
+def _prefix_hash(f, offset: int):
+    """sha256-объект первых offset байт файла (без разбора строк)."""
+    h = hashlib.sha256()
+    f.seek(0)
+    left = offset
+    while left > 0:
+        block = f.read(min(HASH_BLOCK, left))
+        if not block:
+            break
+        h.update(block)
+        left -= len(block)
+    return h
+
+
+def ingest(csv_path: str = 'info.csv', half_life_days: Optional[float] = None,
+           state_path: Optional[str] = None) -> PurchaseLedger:
+    """
+    Обновляет журнал по info.csv, разбирая только строки, дописанные после прошлого запуска.
+    Если файл не менялся (mtime и размер те же), он не читается вовсе. Иначе уже учтённая
+    часть перехэшируется целиком: если её переписали (в том числе исправили цену в старой
+    строке без изменения размера) или файл укоротили, журнал пересобирается с нуля.
+    Правка, сохранившая и размер, и mtime файла, не обнаруживается.
+    """
+    state_path = state_path or ledger_path(csv_path)
+    ledger = PurchaseLedger.load(state_path, half_life_days)
+    with open(csv_path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        stamp = (st.st_mtime_ns, st.st_size)
+        if ledger is not None and ledger.stamp == stamp:
+            return ledger
+        h = None
+        if ledger is not None:
+            if ledger.offset <= st.st_size:
+                h = _prefix_hash(f, ledger.offset)
+            if h is None or h.hexdigest() != ledger.prefix:
+                ledger = None
+        if ledger is None:
+            ledger = PurchaseLedger(half_life_days)
+        f.seek(0)
+        header = f.readline().decode('utf-8-sig')
+        fieldnames = next(csv.reader([header]))
+        start = max(ledger.offset, f.tell())
+        if h is None or start != ledger.offset:
+            h = _prefix_hash(f, start)
+        f.seek(start)
+        new = f.read()
+        # строка без перевода в конце файла тоже учитывается: append_purchases начинает с новой строки
+        for row in csv.DictReader(io.StringIO(new.decode('utf-8')), fieldnames=fieldnames):
+            if any(row.values()):
+                ledger.add_row(row)
+        h.update(new)
+        ledger.offset = start + len(new)
+        ledger.prefix = h.hexdigest()
+        ledger.stamp = stamp
+    ledger.save(state_path)
+    return ledger
+
+
+def append_purchases(rows: Iterable[dict], csv_path: str = 'info.csv',
+                     half_life_days: Optional[float] = None) -> PurchaseLedger:
+    """Дописывает покупки в конец info.csv и сразу учитывает их в журнале."""
+    with open(csv_path, 'rb') as f:
+        fieldnames = next(csv.reader([f.readline().decode('utf-8-sig')]))
+        f.seek(-1, os.SEEK_END)
+        needs_newline = f.read(1) != b'\n'
+    with open(csv_path, 'a', encoding='utf-8', newline='') as f:
+        if needs_newline:
+            f.write('\n')
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore', lineterminator='\n')
+        for row in rows:
+            row = dict(row)
+            row.setdefault(DATE, date.today().isoformat())
+            writer.writerow(row)
+    return ingest(csv_path, half_life_days)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Средневзвешенные цены материалов по журналу закупок')
+    parser.add_argument('--src', default='info.csv')
+    parser.add_argument('--dst', default='short_materials.csv')
+    parser.add_argument('--half-life', type=float, default=None, metavar='DAYS',
+                        help='период полураспада веса покупки в днях (по умолчанию без затухания)')
+    args = parser.parse_args()
+    ledger = ingest(args.src, args.half_life)
+    ledger.write_short_materials(args.dst)
+    print(f'Средневзвешенные цены сохранены в {args.dst}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import List, Optional, Tuple
+
+from batch_calculator import JewelryCostBatchResult, calculate_jewelry_costs
+from cost_cache import CostCache, catalog_version, cost_input_key
+from example_usage import (
+    build_cost_input, build_price_table, generate_instagram_description, load_short_materials,
+    select_order_materials,
+)
+from jewelry_cost_calculator import PRICE_TIERS, JewelryCostInput, JewelryCostResult, price_comment
+from piece_files import get_start_price
+
+
+class WarmCatalog:
+    """
+    Таблица цен, постоянно находящаяся в памяти. Файл проверяется не чаще
+    раза в check_interval секунд и перечитывается, если изменился его mtime.
+    """
+
+    def __init__(self, csv_path: str = 'short_materials.csv', check_interval: float = 1.0):
+        self.csv_path = csv_path
+        self.check_interval = check_interval
+        self._stamp = None
+        self._checked_at = 0.0
+        self.table = {}
+        self.version = ""
+        self.reloads = 0
+        self._reload()
+
+    def _reload(self) -> None:
+        st = os.stat(self.csv_path)
+        table = build_price_table(load_short_materials(self.csv_path))
+        version = catalog_version(self.csv_path)
+        self.table, self.version = table, version
+        self._stamp = (st.st_mtime_ns, st.st_size)
+        self.reloads += 1
+
+    def get(self) -> dict:
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            try:
+                st = os.stat(self.csv_path)
+            except OSError:
+                return self.table  # файл временно недоступен — работаем со старыми ценами
+            if (st.st_mtime_ns, st.st_size) != self._stamp:
+                try:
+                    self._reload()
+                except (OSError, ValueError, KeyError):
+                    pass  # файл переписывается прямо сейчас — отдаём старые цены, повторим позже
+        return self.table
+
+
+class MicroBatcher:
+    """
+    Собирает запросы, пришедшие в пределах window секунд, в одну пачку
+    и считает их одним вызовом calculate_jewelry_costs.
+    Рекомендуемые цены пачки сразу пересчитываются во все currencies одним векторным шагом.
+    """
+
+    def __init__(self, window: float = 0.002, max_batch: int = 512, currencies: Tuple[str, ...] = ()):
+        self.window = window
+        self.max_batch = max_batch
+        self.currencies = tuple(currencies)
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.batches = 0
+        self.items = 0
+        self._task = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, data: JewelryCostInput) -> Tuple[JewelryCostBatchResult, int]:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((data, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(pending) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._compute(pending)
+
+    def _compute(self, pending: List[tuple]) -> None:
+        try:
+            result = calculate_jewelry_costs([data for data, _ in pending], self.currencies)
+        except Exception as e:  # ошибка пачки передаётся каждому ожидающему запросу
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.items += len(pending)
+        for i, (_, future) in enumerate(pending):
+            if not future.done():
+                future.set_result((result, i))
+
+
+def result_from_batch(batch: JewelryCostBatchResult, i: int, breakdown: bool) -> JewelryCostResult:
+    """Результат для i-го изделия; детализация строится только по запросу."""
+    if breakdown:
+        return batch.result(i)
+    prices = batch.tiers[i].tolist()
+    return JewelryCostResult(
+        cost_breakdown={},
+        total_cost=float(batch.total_cost[i]),
+        recommended_prices={label: p for (label, _), p in zip(PRICE_TIERS, prices)},
+        price_comment=price_comment(prices[0], prices[1]),
+        converted_prices=batch.converted_prices(i),
+    )
+
+
+class QuoteService:
+    """
+    Локальный HTTP-сервис: POST /cost, POST /description, GET /health.
+    Повторные расчёты отдаются из кэша; при перезагрузке каталога кэш сбрасывается.
+    """
+
+    def __init__(self, catalog: WarmCatalog, batcher: MicroBatcher, cache: Optional[CostCache] = None):
+        self.catalog = catalog
+        self.batcher = batcher
+        self.cache = cache if cache is not None else CostCache(catalog=catalog.version)
+
+    async def _quote(self, order: dict, breakdown: bool):
+        selected, stones = select_order_materials(order, self.catalog.get())
+        self.cache.set_catalog_version(self.catalog.version)
+        data = build_cost_input(selected, float(order['hours']), float(order['rate']))
+        key = cost_input_key(data, self.batcher.currencies, 'full' if breakdown else 'summary')
+        result = self.cache.get(key)
+        if result is None:
+            batch, i = await self.batcher.submit(data)
+            result = result_from_batch(batch, i, breakdown)
+            self.cache.put(key, result)
+        return selected, stones, result
+
+    async def cost(self, order: dict) -> dict:
+        _, _, result = await self._quote(order, bool(order.get('breakdown')))
+        payload = {
+            'total_cost': result.total_cost,
+            'recommended_prices': result.recommended_prices,
+            'price_comment': result.price_comment,
+        }
+        if result.converted_prices:
+            payload['converted_prices'] = result.converted_prices
+        if order.get('breakdown'):
+            payload['cost_breakdown'] = result.cost_breakdown
+        return payload
+
+    async def description(self, order: dict) -> dict:
+        selected, stones, result = await self._quote(order, False)
+        start_price = get_start_price(result)
+        desc = generate_instagram_description(
+            str(order.get('type', '')).strip(), selected, stones, order.get('style', ''),
+            order.get('features', ''), str(order.get('photo') or '').strip(), order.get('size', ''), start_price,
+            self.batcher.currencies,
+        )
+        return {'description': desc, 'total_cost': result.total_cost, 'start_price': start_price}
+
+    def health(self) -> dict:
+        return {
+            'materials': sum(1 for _, unit in self.catalog.table if unit is None),
+            'catalog_reloads': self.catalog.reloads,
+            'batches': self.batcher.batches,
+            'items': self.batcher.items,
+            'cache': self.cache.stats(),
+        }
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, dict]:
+        if method == 'GET' and path == '/health':
+            return 200, self.health()
+        if method != 'POST' or path not in ('/cost', '/description'):
+            return 404, {'error': 'not found'}
+        try:
+            order = json.loads(body or b'{}')
+            if not isinstance(order, dict):
+                return 400, {'error': 'тело запроса должно быть JSON-объектом'}
+            if path == '/cost':
+                return 200, await self.cost(order)
+            return 200, await self.description(order)
+        except (KeyError, ValueError, TypeError) as e:
+            return 400, {'error': f"{type(e).__name__}: {e}"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Минимальный HTTP/1.1 с keep-alive."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                length = 0
+                keep_alive = True
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    name = name.strip().lower()
+                    if name == 'content-length':
+                        length = int(value)
+                    elif name == 'connection' and value.strip().lower() == 'close':
+                        keep_alive = False
+                body = await reader.readexactly(length) if length else b''
+                status, payload = await self.dispatch(method, path, body)
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found'}[status]
+                writer.write(
+                    f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    .encode('latin-1') + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host: str = '127.0.0.1', port: int = 8765, materials_csv: str = 'short_materials.csv',
+                window: float = 0.002, max_batch: int = 512, currencies: Tuple[str, ...] = (),
+                cache_path: Optional[str] = None) -> None:
+    catalog = WarmCatalog(materials_csv)
+    batcher = MicroBatcher(window, max_batch, currencies)
+    batcher.start()
+    service = QuoteService(catalog, batcher, CostCache(disk_path=cache_path, catalog=catalog.version))
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Сервис расчёта запущен на http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.stop()
+        service.cache.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Локальный сервис расчёта себестоимости и описаний')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--materials', default='short_materials.csv')
+    parser.add_argument('--window-ms', type=float, default=2.0, help='окно сбора пачки запросов')
+    parser.add_argument('--max-batch', type=int, default=512)
+    parser.add_argument('--currencies', default='USD', help='валюты для цен через запятую (пусто — только тенге)')
+    parser.add_argument('--cache', metavar='FILE', help='SQLite-файл кэша расчётов между перезапусками')
+    args = parser.parse_args()
+    currencies = tuple(c.strip().upper() for c in args.currencies.split(',') if c.strip())
+    try:
+        asyncio.run(serve(args.host, args.port, args.materials, args.window_ms / 1000, args.max_batch,
+                          currencies, args.cache))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()